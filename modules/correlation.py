@@ -1,30 +1,956 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
 import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
 import pandas as pd
 import numpy as np
-from io import StringIO
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from scipy.fft import next_fast_len
+from scipy.stats import norm, probplot, t as student_t
+from utils.data import (
+    compile_schema,
+    dataset_fingerprint,
+    dataset_uploader,
+    dataset_view,
+    read_numeric_csv,
+    register_dataset,
+    release_dataset,
+    text_fingerprint,
+)
 from utils.export import export_as_pdf, export_as_png
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Validation des données
 # ─────────────────────────────────────────────────────────────────────────────
-def validate_correlation_data(df: pd.DataFrame):
+# Schéma déclaratif : vérifié en une passe, verdict mis en cache par empreinte du jeu de données
+CORRELATION_SCHEMA = {
+    "min_numeric_columns": 2,
+    "messages": {
+        "empty": "Le jeu de données est vide.",
+        "min_numeric_columns": "Le jeu de données doit contenir au moins deux colonnes numériques pour l'analyse de corrélation.",
+    },
+}
+validate_correlation_schema = compile_schema(CORRELATION_SCHEMA)
+
+
+def validate_correlation_data(df: pd.DataFrame, fingerprint: str | None = None):
     """Vérifie que la table comporte au moins deux colonnes numériques non vides."""
-    if df.empty:
-        return False, "Le jeu de données est vide."
-    if len(df.select_dtypes(include=np.number).columns) < 2:
-        return (
-            False,
-            "Le jeu de données doit contenir au moins deux colonnes numériques pour l'analyse de corrélation.",
+    return validate_correlation_schema(df, fingerprint)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Matrice de corrélation par blocs
+# ─────────────────────────────────────────────────────────────────────────────
+def iter_pairwise_blocks(values: np.ndarray, shift: np.ndarray, block_size: int = 256):
+    """
+    Parcourt les paires de blocs de colonnes (triangle supérieur) d'un tableau n × p.
+
+    Les colonnes sont traitées par blocs de `block_size` : chaque bloc est
+    décalé de `shift` (pour limiter les erreurs d'arrondi) et masqué au
+    moment où il sert, si bien que la mémoire de travail reste de l'ordre
+    de n × `block_size` et non d'une copie du tableau. Chaque paire de blocs
+    est obtenue par quelques produits matriciels. Les valeurs manquantes
+    sont gérées par masques : chaque somme porte sur les lignes où les deux
+    variables sont renseignées.
+
+    Yields:
+        tuple: (i0, j0, n, sx, sy, sxx, syy, sxy) pour le bloc lignes i0…, colonnes j0…
+    """
+    n_rows, n_cols = values.shape
+
+    def prepare(j0):
+        # Bloc centré (valeurs manquantes à 0, ordre colonne) et masque booléen des valeurs renseignées
+        block = np.array(values[:, j0 : j0 + block_size], dtype=np.float64, order="F")
+        mask = ~np.isnan(block)
+        block -= shift[j0 : j0 + block_size]
+        block[~mask] = 0.0
+        return block, mask, not mask.all()
+
+    for i0 in range(0, n_cols, block_size):
+        a, mask_a, missing_a = prepare(i0)
+        for j0 in range(i0, n_cols, block_size):
+            b, mask_b, missing_b = (a, mask_a, missing_a) if j0 == i0 else prepare(j0)
+            sxy = a.T @ b
+            if missing_a or missing_b:
+                ma, mb = mask_a.astype(np.float64), mask_b.astype(np.float64)
+                n = ma.T @ mb
+                sx, sy = a.T @ mb, ma.T @ b
+                sxx, syy = (a * a).T @ mb, ma.T @ (b * b)
+            else:
+                n = np.full(sxy.shape, float(n_rows))
+                sx = np.broadcast_to(a.sum(axis=0)[:, None], sxy.shape)
+                sy = np.broadcast_to(b.sum(axis=0)[None, :], sxy.shape)
+                sxx = np.broadcast_to((a * a).sum(axis=0)[:, None], sxy.shape)
+                syy = np.broadcast_to((b * b).sum(axis=0)[None, :], sxy.shape)
+            yield i0, j0, n, sx, sy, sxx, syy, sxy
+
+
+def column_shift(values: np.ndarray, block_size: int = 256):
+    """Moyenne de chaque colonne sur ses valeurs renseignées (0 si la colonne est vide), calculée par blocs."""
+    shift = np.zeros(values.shape[1])
+    for j0 in range(0, values.shape[1], block_size):
+        block = values[:, j0 : j0 + block_size]
+        counts = (~np.isnan(block)).sum(axis=0)
+        shift[j0 : j0 + block_size] = np.where(counts > 0, np.nansum(block, axis=0) / np.maximum(counts, 1), 0.0)
+    return shift
+
+
+def pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """Coefficient de Pearson (vectorisé) à partir des sommes suffisantes."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx**2 / n) * (syy - sy**2 / n)
+        r = np.where((n > 1) & (var > 0), cov / np.sqrt(var), np.nan)
+    return np.clip(r, -1.0, 1.0)
+
+
+def correlation_matrix(df: pd.DataFrame, method: str = "pearson", block_size: int = 256):
+    """
+    Calcule la matrice de corrélation (Pearson ou Spearman) des colonnes numériques.
+
+    Le calcul est fait par blocs de colonnes (voir `iter_pairwise_blocks`),
+    sur les lignes complètes de chaque paire. En Spearman, les rangs sont
+    calculés une fois par colonne sur toutes ses valeurs renseignées.
+    """
+    numeric = df.select_dtypes(include=np.number)
+    if method == "spearman":
+        numeric = numeric.rank()
+    columns = numeric.columns
+    values = numeric.to_numpy(dtype=np.float64)
+    n_cols = values.shape[1]
+
+    corr = np.full((n_cols, n_cols), np.nan)
+    for i0, j0, *sums in iter_pairwise_blocks(values, column_shift(values), block_size):
+        block = pearson_from_sums(*sums)
+        corr[i0 : i0 + block_size, j0 : j0 + block_size] = block
+        corr[j0 : j0 + block_size, i0 : i0 + block_size] = block.T
+
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_correlation_matrix(fingerprint: str, _df: pd.DataFrame, method: str = "pearson"):
+    """Matrice de corrélation mise en cache par empreinte du jeu de données et méthode."""
+    return correlation_matrix(_df, method)
+
+
+def create_correlation_heatmap(corr: pd.DataFrame, chart_title: str = "Matrice de corrélation"):
+    """Retourne une carte de chaleur Matplotlib de la matrice de corrélation."""
+    n_cols = len(corr.columns)
+    size = min(14, max(6, 0.45 * n_cols + 3))
+    fig, ax = plt.subplots(figsize=(size + 1.5, size))
+
+    image = ax.imshow(corr.to_numpy(), cmap="coolwarm", vmin=-1, vmax=1, interpolation="nearest")
+    fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04, label="r")
+
+    if n_cols <= 40:
+        ax.set_xticks(range(n_cols))
+        ax.set_yticks(range(n_cols))
+        ax.set_xticklabels(corr.columns, rotation=45, ha="right", fontsize=9)
+        ax.set_yticklabels(corr.columns, fontsize=9)
+    else:
+        ax.set_xlabel(f"{n_cols} variables")
+        ax.set_ylabel(f"{n_cols} variables")
+
+    if n_cols <= 12:
+        for i in range(n_cols):
+            for j in range(n_cols):
+                value = corr.iat[i, j]
+                if not np.isnan(value):
+                    ax.text(
+                        j, i, f"{value:.2f}", ha="center", va="center", fontsize=9,
+                        color="white" if abs(value) > 0.6 else "black",
+                    )
+
+    ax.set_title(chart_title, fontsize=14)
+    plt.tight_layout()
+    return fig
+
+
+def display_correlation_matrix(df: pd.DataFrame, key: str, fingerprint: str | None = None):
+    """Affiche la matrice de corrélation (mise en cache) d'un jeu de données."""
+    st.markdown("##### Matrice de corrélation")
+    method = st.radio("Coefficient :", ["Pearson", "Spearman"], horizontal=True, key=f"{key}_matrix_method")
+    corr = cached_correlation_matrix(fingerprint or dataset_fingerprint(df), df, method.lower())
+    st.pyplot(create_correlation_heatmap(corr, f"Matrice de corrélation ({method})"))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_read_numeric_csv(text_hash: str, _text: str):
+    """
+    Lecture des données collées, mise en cache par empreinte du texte.
+
+    Returns:
+        tuple: (DataFrame des colonnes numériques, format détecté, empreinte du DataFrame)
+    """
+    df, info = read_numeric_csv(_text)
+    return df, info, dataset_fingerprint(df)
+
+
+def create_pair_plot(df: pd.DataFrame, columns: list, corr: pd.DataFrame, max_points: int = 5000, bins: int = 30, seed: int = 42):
+    """
+    Matrice de nuages de points (une figure, axes partagés par ligne et par colonne).
+
+    Les nuages sont tracés en marqueurs `plot` rastérisés sur un même
+    échantillon de `max_points` lignes au plus ; la diagonale montre
+    l'histogramme de chaque variable (toutes les lignes), mis à l'échelle de
+    son axe. Le r de chaque panneau est lu dans `corr`.
+    """
+    k = len(columns)
+    values = df[columns].to_numpy(dtype=np.float64)
+    sample = values
+    if len(values) > max_points:
+        sample = values[np.sort(np.random.default_rng(seed).choice(len(values), max_points, replace=False))]
+    marker_size = 3 if len(sample) <= 2000 else 1
+
+    size = min(2.2 * k, 22)
+    fig, axes = plt.subplots(k, k, figsize=(size, size), sharex="col", sharey="row", squeeze=False)
+
+    for i, row_col in enumerate(columns):
+        for j, col_col in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                finite = values[:, j][~np.isnan(values[:, j])]
+                counts, edges = np.histogram(finite, bins=bins)
+                low, high = (edges[0], edges[-1]) if len(finite) else (0.0, 1.0)
+                heights = low + 0.95 * (high - low) * counts / max(counts.max(), 1)
+                ax.stairs(heights, edges, baseline=low, fill=True, color="#1f77b4", alpha=0.6)
+            else:
+                ax.plot(sample[:, j], sample[:, i], "o", markersize=marker_size, alpha=0.4, color="#1f77b4", markeredgewidth=0, rasterized=True)
+                r = corr.at[row_col, col_col]
+                ax.text(
+                    0.05, 0.92, f"r = {r:.2f}", transform=ax.transAxes, fontsize=8, va="top",
+                    color="#d62728" if r < 0 else "#2ca02c",
+                    bbox=dict(boxstyle="round", facecolor="white", alpha=0.7, linewidth=0),
+                )
+            ax.tick_params(axis="both", labelsize=7)
+            # Peu de graduations : leur création domine le temps de rendu des k² panneaux
+            ax.xaxis.set_major_locator(MaxNLocator(3))
+            ax.yaxis.set_major_locator(MaxNLocator(3))
+            if i == k - 1:
+                ax.set_xlabel(col_col, fontsize=8)
+            if j == 0:
+                ax.set_ylabel(row_col, fontsize=8)
+
+    title = "Matrice de nuages de points"
+    if len(sample) < len(values):
+        title += f" (échantillon de {len(sample)} lignes sur {len(values)})"
+    fig.suptitle(title, fontsize=12)
+    # Espacement fixe : les étiquettes intérieures sont masquées par le partage des axes
+    fig.subplots_adjust(left=0.08, right=0.98, bottom=0.08, top=0.94, wspace=0.08, hspace=0.08)
+    return fig
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Recherche des paires les plus corrélées
+# ─────────────────────────────────────────────────────────────────────────────
+def top_correlated_pairs(df: pd.DataFrame, k: int = 10, method: str = "pearson", block_size: int = 256):
+    """
+    Classe les `k` paires de colonnes numériques de plus forte corrélation absolue.
+
+    La matrice n'est jamais construite entière : chaque paire de blocs (voir
+    `iter_pairwise_blocks`) fournit ses `k` meilleurs candidats, fusionnés
+    dans un tas de taille `k`.
+
+    Returns:
+        pandas.DataFrame: colonnes « Variable X », « Variable Y », « r », « N »,
+        triées par |r| décroissant
+    """
+    numeric = df.select_dtypes(include=np.number)
+    if method == "spearman":
+        numeric = numeric.rank()
+    columns = numeric.columns
+    values = numeric.to_numpy(dtype=np.float64)
+
+    heap = []  # (|r|, i, j, r, n), plus petit en tête
+    for i0, j0, n, *sums in iter_pairwise_blocks(values, column_shift(values), block_size):
+        r = pearson_from_sums(n, *sums)
+        strength = np.abs(r)
+        if i0 == j0:
+            strength = np.where(np.triu(np.ones_like(strength, dtype=bool), k=1), strength, np.nan)
+        flat = np.nan_to_num(strength, nan=-1.0).ravel()
+
+        count = min(k, flat.size)
+        candidates = np.argpartition(flat, -count)[-count:]
+        for c in candidates:
+            if flat[c] < 0 or (len(heap) == k and flat[c] <= heap[0][0]):
+                continue
+            bi, bj = divmod(int(c), strength.shape[1])
+            item = (float(flat[c]), i0 + bi, j0 + bj, float(r[bi, bj]), int(n[bi, bj]))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heapreplace(heap, item)
+
+    best = sorted(heap, reverse=True)
+    return pd.DataFrame(
+        {
+            "Variable X": [columns[i] for _, i, _, _, _ in best],
+            "Variable Y": [columns[j] for _, _, j, _, _ in best],
+            "r": [r for _, _, _, r, _ in best],
+            "N": [n for _, _, _, _, n in best],
+        }
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_top_correlated_pairs(fingerprint: str, _df: pd.DataFrame, k: int = 10, method: str = "pearson"):
+    """Paires les plus corrélées, mises en cache par empreinte du jeu de données."""
+    return top_correlated_pairs(_df, k, method)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Statistiques suffisantes (r, R², régression pour toute paire)
+# ─────────────────────────────────────────────────────────────────────────────
+def build_sufficient_stats(df: pd.DataFrame, block_size: int = 256):
+    """
+    Calcule une fois les statistiques suffisantes des colonnes numériques.
+
+    Pour chaque paire (i, j), sur les lignes où les deux variables sont
+    renseignées : effectif, somme et somme des carrés de x_i, somme des
+    produits croisés. Les valeurs sont décalées de la moyenne de chaque
+    colonne au chargement (décalage conservé lors des ajouts de lignes).
+
+    Returns:
+        dict: colonnes, décalages et matrices `count`, `sum`, `sumsq`, `cross`
+        (p × p), avec `sum[i, j]` = somme de x_i sur les lignes communes à i et j.
+    """
+    numeric = df.select_dtypes(include=np.number)
+    values = numeric.to_numpy(dtype=np.float64)
+    n_cols = values.shape[1]
+    stats = {
+        "columns": numeric.columns.tolist(),
+        "position": {col: i for i, col in enumerate(numeric.columns)},
+        "shift": column_shift(values),
+        "n_rows": 0,
+    }
+    for name in ["count", "sum", "sumsq", "cross"]:
+        stats[name] = np.zeros((n_cols, n_cols))
+    append_rows(stats, numeric, block_size)
+    return stats
+
+
+def append_rows(stats: dict, new_rows: pd.DataFrame, block_size: int = 256):
+    """Ajoute de nouvelles lignes aux statistiques suffisantes (mise à jour incrémentale)."""
+    values = new_rows[stats["columns"]].to_numpy(dtype=np.float64)
+    if len(values) == 0:
+        return stats
+    for i0, j0, n, sx, sy, sxx, syy, sxy in iter_pairwise_blocks(values, stats["shift"], block_size):
+        rows, cols = slice(i0, i0 + block_size), slice(j0, j0 + block_size)
+        stats["count"][rows, cols] += n
+        stats["sum"][rows, cols] += sx
+        stats["sumsq"][rows, cols] += sxx
+        stats["cross"][rows, cols] += sxy
+        if i0 != j0:
+            stats["count"][cols, rows] += n.T
+            stats["sum"][cols, rows] += sy.T
+            stats["sumsq"][cols, rows] += syy.T
+            stats["cross"][cols, rows] += sxy.T
+    stats["n_rows"] += len(values)
+    return stats
+
+
+def pair_statistics(stats: dict, x_col: str, y_col: str):
+    """
+    r, R², pente et ordonnée à l'origine d'une paire, en O(1) depuis les statistiques suffisantes.
+
+    Returns:
+        dict: n, r, r_squared, slope, intercept, mean_x, mean_y
+    """
+    i, j = stats["position"][x_col], stats["position"][y_col]
+    n = stats["count"][i, j]
+    sx, sy = stats["sum"][i, j], stats["sum"][j, i]
+    sxx, syy = stats["sumsq"][i, j], stats["sumsq"][j, i]
+    sxy = stats["cross"][i, j]
+
+    r = float(pearson_from_sums(n, sx, sy, sxx, syy, sxy)) if n > 0 else np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = sxx - sx**2 / n
+        slope = (sxy - sx * sy / n) / var_x if var_x > 0 else np.nan
+        mean_x = stats["shift"][i] + sx / n
+        mean_y = stats["shift"][j] + sy / n
+    return {
+        "n": int(n),
+        "r": r,
+        "r_squared": r**2,
+        "slope": float(slope),
+        "intercept": float(mean_y - slope * mean_x),
+        "mean_x": float(mean_x),
+        "mean_y": float(mean_y),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Intervalles de confiance (Fisher z, bootstrap)
+# ─────────────────────────────────────────────────────────────────────────────
+def fisher_z_interval(r: float, n: int, confidence: float = 0.95):
+    """Intervalle de confiance de r par la transformation z de Fisher."""
+    if n <= 3 or not np.isfinite(r):
+        return (np.nan, np.nan)
+    z = np.arctanh(np.clip(r, -1 + 1e-12, 1 - 1e-12))
+    half_width = norm.ppf(0.5 + confidence / 2) / np.sqrt(n - 3)
+    return (float(np.tanh(z - half_width)), float(np.tanh(z + half_width)))
+
+
+def bootstrap_pair(x: np.ndarray, y: np.ndarray, n_boot: int, seed, max_cells: int = 2_000_000):
+    """
+    r et pente de `n_boot` rééchantillonnages (avec remise) des lignes de (x, y).
+
+    Les indices sont tirés par lots d'au plus `max_cells` cellules ; chaque
+    lot est traité en une seule passe vectorisée (une ligne par tirage).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    r_values, slopes = np.empty(n_boot), np.empty(n_boot)
+    batch = max(1, min(n_boot, max_cells // max(n, 1)))
+    for start in range(0, n_boot, batch):
+        stop = min(start + batch, n_boot)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        xs, ys = x[idx], y[idx]
+        xs -= xs.mean(axis=1, keepdims=True)
+        ys -= ys.mean(axis=1, keepdims=True)
+        sxx = np.einsum("ij,ij->i", xs, xs)
+        syy = np.einsum("ij,ij->i", ys, ys)
+        sxy = np.einsum("ij,ij->i", xs, ys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r_values[start:stop] = sxy / np.sqrt(sxx * syy)
+            slopes[start:stop] = sxy / sxx
+    return r_values, slopes
+
+
+def bootstrap_correlation(
+    x: np.ndarray,
+    y: np.ndarray,
+    n_boot: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 42,
+    workers: int | None = None,
+    parallel_threshold: int = 200_000,
+):
+    """
+    Intervalles de confiance bootstrap (percentiles) de r et de la pente.
+
+    Au‑delà de `parallel_threshold` lignes, les tirages sont répartis entre
+    `workers` threads (par défaut, un par cœur), chacun avec son propre
+    flux aléatoire issu de `seed`. Les calculs numpy libèrent le GIL : les
+    threads partagent x et y sans copie ni processus forké dans le serveur
+    Streamlit.
+
+    Returns:
+        dict: bornes (basse, haute) pour `r` et `slope`, nombre de tirages
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+
+    if len(x) >= parallel_threshold and workers > 1 and n_boot >= workers:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [len(part) for part in np.array_split(np.arange(n_boot), workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(bootstrap_pair, [x] * workers, [y] * workers, sizes, seeds))
+        r_values = np.concatenate([part[0] for part in parts])
+        slopes = np.concatenate([part[1] for part in parts])
+    else:
+        r_values, slopes = bootstrap_pair(x, y, n_boot, seed)
+
+    alpha = (1 - confidence) / 2
+    return {
+        "r": tuple(np.nanquantile(r_values, [alpha, 1 - alpha]).tolist()),
+        "slope": tuple(np.nanquantile(slopes, [alpha, 1 - alpha]).tolist()),
+        "n_boot": n_boot,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_bootstrap_correlation(fingerprint: str, _x: np.ndarray, _y: np.ndarray, n_boot: int, confidence: float):
+    """`bootstrap_correlation` mis en cache par empreinte du jeu de données et paire de variables."""
+    return bootstrap_correlation(_x, _y, n_boot=n_boot, confidence=confidence)
+
+
+def correlation_intervals(pair: dict, bootstrap: dict | None = None, confidence: float = 0.95):
+    """Regroupe les intervalles de confiance de r (Fisher z, bootstrap) et de la pente (bootstrap)."""
+    return {
+        "confidence": confidence,
+        "r_fisher": fisher_z_interval(pair["r"], pair["n"], confidence),
+        "r_bootstrap": bootstrap["r"] if bootstrap else None,
+        "slope_bootstrap": bootstrap["slope"] if bootstrap else None,
+    }
+
+
+def intervals_table(pair: dict, intervals: dict):
+    """Tableau exportable des estimations et de leurs intervalles de confiance."""
+    rows = [("r", pair["r"], intervals["r_fisher"], "Fisher z")]
+    if intervals["r_bootstrap"]:
+        rows.append(("r", pair["r"], intervals["r_bootstrap"], "Bootstrap (percentiles)"))
+    rows.append(("R²", pair["r_squared"], (np.nan, np.nan), ""))
+    if intervals["slope_bootstrap"]:
+        rows.append(("Pente", pair["slope"], intervals["slope_bootstrap"], "Bootstrap (percentiles)"))
+    level = f"{100 * intervals['confidence']:.0f} %"
+    return pd.DataFrame(
+        {
+            "Statistique": [row[0] for row in rows],
+            "Estimation": [row[1] for row in rows],
+            f"IC {level} (bas)": [row[2][0] for row in rows],
+            f"IC {level} (haut)": [row[2][1] for row in rows],
+            "Méthode": [row[3] for row in rows],
+            "N": pair["n"],
+        }
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Régression linéaire multiple (équations normales)
+# ─────────────────────────────────────────────────────────────────────────────
+def regression_gram(stats: dict, columns: list):
+    """
+    Matrice de Gram centrée (Xᵀ X) et moyennes d'un sous‑ensemble de colonnes.
+
+    Lue directement dans les statistiques suffisantes : ajouter ou retirer
+    une variable explicative revient à extraire une autre sous‑matrice, sans
+    repasser sur les données. Valable lorsque les colonnes n'ont pas de
+    valeurs manquantes (toutes les paires portent alors sur les mêmes lignes).
+    """
+    idx = [stats["position"][col] for col in columns]
+    block = np.ix_(idx, idx)
+    count = stats["count"][block]
+    sums = stats["sum"][block]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gram = stats["cross"][block] - sums * sums.T / count
+        means = stats["shift"][idx] + np.diag(sums) / np.diag(count)
+    return {"n": int(count.min()), "gram": gram, "means": means, "columns": list(columns)}
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_complete_case_gram(fingerprint: str, _df: pd.DataFrame, columns: tuple):
+    """Matrice de Gram sur les lignes complètes pour `columns` (données avec valeurs manquantes)."""
+    return regression_gram(build_sufficient_stats(_df[list(columns)].dropna()), columns)
+
+
+def regression_design(fingerprint: str, df: pd.DataFrame, stats: dict, columns: list):
+    """Matrice de Gram pour la régression : extraite des statistiques suffisantes si possible, sinon lignes complètes."""
+    idx = [stats["position"][col] for col in columns]
+    if (stats["count"][np.ix_(idx, idx)] == stats["n_rows"]).all():
+        return regression_gram(stats, columns)
+    return cached_complete_case_gram(fingerprint, df, tuple(columns))
+
+
+def multiple_regression(design: dict, response: str, predictors: list):
+    """
+    Ajuste y = b0 + b1·x1 + … + bk·xk par moindres carrés à partir de la matrice de Gram.
+
+    Returns:
+        dict: table des coefficients (erreur type, t, p‑valeur, VIF),
+        coefficients, ordonnée à l'origine, R², R² ajusté, écart‑type résiduel, n
+    """
+    position = {col: i for i, col in enumerate(design["columns"])}
+    px = [position[col] for col in predictors]
+    py = position[response]
+    gram, means = design["gram"], design["means"]
+    gxx, gxy, gyy = gram[np.ix_(px, px)], gram[px, py], gram[py, py]
+    n, k = design["n"], len(predictors)
+
+    coef = np.linalg.lstsq(gxx, gxy, rcond=None)[0]
+    inverse = np.linalg.pinv(gxx)
+    sse = max(float(gyy - coef @ gxy), 0.0)
+    dof = n - k - 1
+    sigma2 = sse / dof if dof > 0 else np.nan
+    intercept = float(means[py] - coef @ means[px])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        se = np.sqrt(sigma2 * np.r_[1 / n + means[px] @ inverse @ means[px], np.diag(inverse)])
+        t_values = np.r_[intercept, coef] / se
+        p_values = 2 * student_t.sf(np.abs(t_values), dof) if dof > 0 else np.full(k + 1, np.nan)
+        # VIF_j = 1 / (1 - R²_j) = diagonale de l'inverse de la matrice de corrélation des X
+        vif = np.diag(gxx) * np.diag(inverse)
+        r_squared = 1 - sse / gyy
+        adj_r_squared = 1 - (1 - r_squared) * (n - 1) / dof if dof > 0 else np.nan
+
+    table = pd.DataFrame(
+        {
+            "Terme": ["Ordonnée à l'origine"] + list(predictors),
+            "Coefficient": np.r_[intercept, coef],
+            "Erreur type": se,
+            "t": t_values,
+            "p‑valeur": p_values,
+            "VIF": np.r_[np.nan, vif],
+        }
+    )
+    return {
+        "table": table,
+        "coef": coef,
+        "intercept": intercept,
+        "r_squared": float(r_squared),
+        "adj_r_squared": float(adj_r_squared),
+        "sigma": float(np.sqrt(sigma2)),
+        "n": n,
+    }
+
+
+def create_residual_plots(df: pd.DataFrame, response: str, predictors: list, model: dict):
+    """Résidus en fonction des valeurs ajustées et droite de Henry (Q‑Q) des résidus."""
+    complete = df[predictors + [response]].dropna()
+    fitted = complete[predictors].to_numpy(dtype=np.float64) @ model["coef"] + model["intercept"]
+    residuals = complete[response].to_numpy(dtype=np.float64) - fitted
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    keep = stratified_sample(fitted, residuals)
+    ax1.scatter(fitted[keep], residuals[keep], alpha=0.6, s=20, color="#1f77b4", linewidth=0, rasterized=True)
+    ax1.axhline(0, color="#ff7f0e", linestyle="--", linewidth=2)
+    ax1.set_xlabel("Valeurs ajustées", fontsize=11)
+    ax1.set_ylabel("Résidus", fontsize=11)
+    ax1.set_title("Résidus vs valeurs ajustées", fontsize=13)
+    ax1.grid(True, linestyle="--", alpha=0.3)
+
+    (theoretical, ordered), (slope, intercept, _) = probplot(residuals[keep])
+    ax2.scatter(theoretical, ordered, alpha=0.6, s=20, color="#1f77b4", linewidth=0, rasterized=True)
+    ax2.plot(theoretical, slope * theoretical + intercept, "--", color="#ff7f0e", linewidth=2)
+    ax2.set_xlabel("Quantiles théoriques (loi normale)", fontsize=11)
+    ax2.set_ylabel("Résidus ordonnés", fontsize=11)
+    ax2.set_title("Normalité des résidus (Q‑Q)", fontsize=13)
+    ax2.grid(True, linestyle="--", alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Corrélations de rang (Spearman, Kendall)
+# ─────────────────────────────────────────────────────────────────────────────
+def column_ranks(values: np.ndarray):
+    """
+    Rangs d'une colonne : rangs moyens (Spearman) et rangs denses entiers (Kendall).
+
+    Les valeurs manquantes gardent un rang moyen NaN et un rang dense de -1.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    average = np.full(len(values), np.nan)
+    average[present] = pd.Series(values[present]).rank(method="average").to_numpy()
+    dense = np.full(len(values), -1, dtype=np.int64)
+    dense[present] = np.unique(values[present], return_inverse=True)[1]
+    return {"average": average, "dense": dense}
+
+
+def get_column_ranks(fingerprint: str, df: pd.DataFrame, column: str):
+    """Rangs d'une colonne, mis en cache dans la session pour le jeu de données courant."""
+    cache = st.session_state.setdefault("correlation_rank_cache", {})
+    if cache.get("fingerprint") != fingerprint:
+        cache.clear()
+        cache["fingerprint"] = fingerprint
+    if column not in cache:
+        cache[column] = column_ranks(df[column].to_numpy(dtype=np.float64))
+    return cache[column]
+
+
+def count_inversions(values: np.ndarray):
+    """
+    Nombre de paires i < j telles que values[i] > values[j], en O(n log n).
+
+    Tri fusion ascendant vectorisé : à chaque niveau, les éléments d'un bloc
+    droit sont localisés par dichotomie dans le bloc gauche trié voisin, puis
+    les deux blocs sont fusionnés (tri stable de séquences déjà triées).
+    """
+    runs = np.asarray(values, dtype=np.int64)
+    n = len(runs)
+    if n < 2:
+        return 0
+    runs = runs - runs.min()
+    span = int(runs.max()) + 1
+    idx = np.arange(n)
+    inversions = 0
+    width = 1
+    while width < n:
+        pair_id = idx // (2 * width)
+        is_right = (idx // width) % 2 == 1
+        keys = pair_id * span + runs
+
+        left_keys = keys[~is_right]
+        right_keys = keys[is_right]
+        right_pair = pair_id[is_right]
+        # éléments du bloc gauche strictement supérieurs à chaque élément du bloc droit
+        after = np.searchsorted(left_keys, right_keys, side="right")
+        end = np.searchsorted(left_keys, (right_pair + 1) * span, side="left")
+        inversions += int((end - after).sum())
+
+        runs = np.sort(keys, kind="stable") - pair_id * span
+        width *= 2
+    return inversions
+
+
+def kendall_tau_b(x_dense: np.ndarray, y_dense: np.ndarray):
+    """
+    τ_b de Kendall en O(n log n) (algorithme de Knight) à partir de rangs denses.
+
+    Les paires discordantes sont les inversions de y une fois les données
+    triées par (x, y) ; les ex‑æquo sont corrigés selon la définition τ_b.
+    """
+    n = len(x_dense)
+    if n < 2:
+        return np.nan
+    n0 = n * (n - 1) / 2
+
+    def _tied_pairs(counts):
+        counts = counts[counts > 1].astype(np.float64)
+        return float((counts * (counts - 1) / 2).sum())
+
+    order = np.lexsort((y_dense, x_dense))
+    xs, ys = x_dense[order], y_dense[order]
+    n1 = _tied_pairs(np.bincount(xs))
+    n2 = _tied_pairs(np.bincount(ys))
+    joint = xs * (int(ys.max()) + 1) + ys
+    n3 = _tied_pairs(np.diff(np.flatnonzero(np.r_[True, joint[1:] != joint[:-1], True])))
+
+    discordant = count_inversions(ys)
+    denominator = np.sqrt((n0 - n1) * (n0 - n2))
+    if denominator == 0:
+        return np.nan
+    return float((n0 - n1 - n2 + n3 - 2 * discordant) / denominator)
+
+
+def rank_correlation(x_ranks: dict, y_ranks: dict, method: str = "spearman"):
+    """
+    ρ de Spearman ou τ_b de Kendall d'une paire à partir des rangs de chaque colonne.
+
+    Si des valeurs manquent, les rangs sont recalculés sur les lignes communes.
+    """
+    complete = (x_ranks["dense"] >= 0) & (y_ranks["dense"] >= 0)
+    if not complete.all():
+        x_ranks = column_ranks(np.where(complete, x_ranks["dense"], np.nan)[complete])
+        y_ranks = column_ranks(np.where(complete, y_ranks["dense"], np.nan)[complete])
+
+    if method == "kendall":
+        return kendall_tau_b(x_ranks["dense"], y_ranks["dense"])
+    x, y = x_ranks["average"], y_ranks["average"]
+    if len(x) < 2 or x.std() == 0 or y.std() == 0:
+        return np.nan
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Corrélation croisée avec décalage (données chronologiques)
+# ─────────────────────────────────────────────────────────────────────────────
+def lagged_cross_correlation(x: np.ndarray, y: np.ndarray, max_lag: int):
+    """
+    r de Pearson entre x(t) et y(t + décalage) pour chaque décalage de -max_lag à +max_lag.
+
+    Toutes les sommes par décalage (effectifs, sommes, carrés, produits
+    croisés, sur les lignes où x(t) et y(t + décalage) sont renseignés) sont
+    obtenues par corrélation circulaire via FFT, soit O(n log n) au total au
+    lieu d'un calcul de corrélation par décalage. Un décalage positif signifie
+    que y réagit après x.
+
+    Returns:
+        pandas.DataFrame: colonnes « Décalage », « r », « N »
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    max_lag = int(min(max_lag, n - 2))
+    size = next_fast_len(2 * n)
+
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    x0 = np.where(mx, x - column_shift(x[:, None])[0], 0.0)
+    y0 = np.where(my, y - column_shift(y[:, None])[0], 0.0)
+
+    fx = {name: np.conj(np.fft.rfft(a, size)) for name, a in [("m", mx.astype(np.float64)), ("v", x0), ("s", x0**2)]}
+    fy = {name: np.fft.rfft(b, size) for name, b in [("m", my.astype(np.float64)), ("v", y0), ("s", y0**2)]}
+
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    def _correlate(a, b):
+        full = np.fft.irfft(fx[a] * fy[b], size)
+        return np.rint(full[lags]) if a == b == "m" else full[lags]
+
+    count = _correlate("m", "m")
+    r = pearson_from_sums(
+        count,
+        _correlate("v", "m"),
+        _correlate("m", "v"),
+        _correlate("s", "m"),
+        _correlate("m", "s"),
+        _correlate("v", "v"),
+    )
+    return pd.DataFrame({"Décalage": lags, "r": r, "N": count.astype(np.int64)})
+
+
+def shift_pair(df: pd.DataFrame, x_col: str, y_col: str, lag: int):
+    """Associe x(t) à y(t + décalage) ; la colonne y est renommée pour indiquer le décalage."""
+    x, y = df[x_col].to_numpy(), df[y_col].to_numpy()
+    if lag > 0:
+        x, y = x[:-lag], y[lag:]
+    elif lag < 0:
+        x, y = x[-lag:], y[:lag]
+    return pd.DataFrame({x_col: x, f"{y_col} (décalé de {lag:+d})": y})
+
+
+def create_cross_correlation_chart(ccf: pd.DataFrame, x_col: str, y_col: str, line_color: str = "#ff7f0e"):
+    """Diagramme en bâtons de la corrélation en fonction du décalage, maximum |r| mis en évidence."""
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.vlines(ccf["Décalage"], 0, ccf["r"], color="#1f77b4", linewidth=2)
+    ax.plot(ccf["Décalage"], ccf["r"], "o", color="#1f77b4", markersize=4)
+
+    if ccf["r"].notna().any():
+        best = ccf.loc[ccf["r"].abs().idxmax()]
+        ax.plot([best["Décalage"]], [best["r"]], "o", color=line_color, markersize=10, label=f"Max |r| : décalage {best['Décalage']:+.0f}")
+    # Seuil de significativité approximatif (±2/√N)
+    bound = 2 / np.sqrt(ccf["N"].clip(lower=1))
+    ax.fill_between(ccf["Décalage"], -bound, bound, color="gray", alpha=0.15, label="±2/√N")
+
+    ax.axhline(0, color="black", linewidth=1)
+    ax.set_xlabel(f"Décalage (lignes) — {y_col} après {x_col} si positif", fontsize=11)
+    ax.set_ylabel("r", fontsize=12)
+    ax.set_ylim(-1.05, 1.05)
+    ax.grid(True, linestyle="--", alpha=0.3)
+    ax.legend(loc="best")
+    ax.set_title("Corrélation croisée en fonction du décalage", fontsize=14)
+    plt.tight_layout()
+    return fig
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lissage non linéaire (LOWESS par classes)
+# ─────────────────────────────────────────────────────────────────────────────
+def binned_lowess(
+    x: np.ndarray,
+    y: np.ndarray,
+    frac: float = 0.3,
+    n_bins: int = 400,
+    grid_size: int = 120,
+    robust_iterations: int = 2,
+):
+    """
+    Lissage LOWESS (régression linéaire locale, poids tricubes) sur données regroupées en classes.
+
+    Les points sont regroupés en `n_bins` classes de x (`bincount` des
+    effectifs, sommes, carrés et produits) ; chaque point de la grille
+    d'évaluation est ajusté par moindres carrés pondérés exacts sur ces
+    sommes, avec un voisinage couvrant la fraction `frac` des points. Le coût
+    est O(n) pour le regroupement plus O(grille × classes), quel que soit n.
+    Les itérations robustes (poids bicarrés sur les résidus) limitent
+    l'influence des valeurs aberrantes.
+
+    Returns:
+        dict: grille `x`, courbe `y`, R² du lissage et de la droite, écart
+        `gain` (part de variance expliquée en plus par le lissage)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    lo, hi = x.min(), x.max()
+    width = (hi - lo) / n_bins or 1.0
+    bins = np.minimum(((x - lo) / width).astype(np.int64), n_bins - 1)
+    centers = lo + (np.arange(n_bins) + 0.5) * width
+    grid = np.linspace(lo, hi, grid_size)
+
+    # Voisinage : demi‑largeur couvrant frac × n points autour de chaque point de grille
+    distance = np.abs(grid[:, None] - centers[None, :])
+    order = np.argsort(distance, axis=1)
+    counts = np.bincount(bins, minlength=n_bins)
+    covered = np.cumsum(counts[order], axis=1)
+    reach = np.argmax(covered >= max(frac * n, 2), axis=1)
+    bandwidth = np.take_along_axis(distance, order, axis=1)[np.arange(grid_size), reach] + width
+    kernel = np.clip(1 - (distance / bandwidth[:, None]) ** 3, 0, None) ** 3
+
+    # Centrage pour la stabilité numérique des sommes
+    xc, yc = x - x.mean(), y - y.mean()
+    robustness = np.ones(n)
+    for iteration in range(robust_iterations + 1):
+        sums = np.stack(
+            [np.bincount(bins, weights=robustness * term, minlength=n_bins) for term in (np.ones(n), xc, yc, xc * xc, xc * yc)],
+            axis=1,
         )
-    return True, ""
+        sw, sx, sy, sxx, sxy = (kernel @ sums).T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x, mean_y = sx / sw, sy / sw
+            var_x = sxx / sw - mean_x**2
+            slope = np.where(var_x > 1e-12 * max(xc.var(), 1e-300), (sxy / sw - mean_x * mean_y) / var_x, 0.0)
+        curve = mean_y + slope * (grid - x.mean() - mean_x) + y.mean()
+
+        residuals = y - np.interp(x, grid, curve)
+        if iteration < robust_iterations:
+            scale = 6 * np.median(np.abs(residuals))
+            if scale == 0:
+                break
+            robustness = np.clip(1 - (residuals / scale) ** 2, 0, None) ** 2
+
+    total = (yc**2).sum()
+    linear_slope = (xc * yc).sum() / (xc**2).sum() if (xc**2).sum() > 0 else 0.0
+    linear_r_squared = 1 - ((yc - linear_slope * xc) ** 2).sum() / total if total > 0 else np.nan
+    smooth_r_squared = 1 - (residuals**2).sum() / total if total > 0 else np.nan
+    return {
+        "x": grid,
+        "y": curve,
+        "frac": frac,
+        "r_squared": float(smooth_r_squared),
+        "linear_r_squared": float(linear_r_squared),
+        "gain": float(smooth_r_squared - linear_r_squared),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_binned_lowess(fingerprint: str, _x: np.ndarray, _y: np.ndarray, frac: float):
+    """`binned_lowess` mis en cache par empreinte du jeu de données, paire de variables et largeur du lissage."""
+    return binned_lowess(_x, _y, frac=frac)
+
+
+def nonlinearity_verdict(smoother: dict):
+    """Qualifie l'écart au modèle linéaire à partir du gain de R² apporté par le lissage."""
+    if smoother["gain"] < 0.02:
+        return "linéaire", "La relation est compatible avec une droite : r de Pearson est approprié."
+    if smoother["gain"] < 0.10:
+        return "légèrement courbe", "Légère courbure : r de Pearson reste indicatif, vérifiez avec Spearman."
+    return (
+        "non linéaire",
+        "Relation nettement non linéaire : r de Pearson sous‑estime ou déforme le lien. "
+        "Préférez Spearman / Kendall (relation monotone) ou une transformation des variables.",
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Création du nuage de points
 # ─────────────────────────────────────────────────────────────────────────────
+def stratified_sample(x: np.ndarray, y: np.ndarray, max_points: int = 5000, grid: int = 40, seed: int = 42):
+    """
+    Sous‑échantillon stratifié sur une grille 2D pour l'affichage des points.
+
+    Chaque cellule de la grille conserve au plus le même nombre de points :
+    les zones denses sont éclaircies tandis que les points isolés (valeurs
+    atypiques) restent visibles.
+
+    Returns:
+        numpy.ndarray: indices des points retenus
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    def _cells(values):
+        lo, hi = values.min(), values.max()
+        scale = grid / (hi - lo) if hi > lo else 0.0
+        return np.minimum(((values - lo) * scale).astype(np.int64), grid - 1)
+
+    cell = _cells(x) * grid + _cells(y)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), cell))
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    rank = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    # Plus grand quota par cellule qui respecte le nombre de points demandé (dichotomie)
+    sizes = np.diff(np.r_[starts, n])
+    low, high = 1, int(sizes.max())
+    while low < high:
+        mid = (low + high + 1) // 2
+        if np.minimum(sizes, mid).sum() <= max_points:
+            low = mid
+        else:
+            high = mid - 1
+    return np.sort(order[rank < low])
+
+
 def create_correlation_scatter(
     df: pd.DataFrame,
     x_col: str,
@@ -38,48 +964,114 @@ def create_correlation_scatter(
     line_color: str = "#ff7f0e",
     show_grid: bool = True,
     show_stats_box: bool = True,
+    stats: dict | None = None,
+    density_threshold: int = 20_000,
+    show_sample_points: bool = True,
+    rank_coefficient: tuple | None = None,
+    intervals: dict | None = None,
+    add_smoother: bool = False,
+    smoother_frac: float = 0.3,
+    smoother: dict | None = None,
 ):
-    """Retourne une figure Matplotlib avec nuage de points + stats."""
+    """
+    Retourne une figure Matplotlib avec nuage de points + stats.
+
+    r, R² et la droite de régression sont lus dans `stats` (voir
+    `build_sufficient_stats`) ; à défaut, ils sont calculés pour la paire.
+    `rank_coefficient` (libellé, valeur) remplace r dans le titre lorsqu'une
+    corrélation de rang est choisie ; `intervals` (voir `correlation_intervals`)
+    ajoute les intervalles de confiance au panneau de stats. Avec
+    `add_smoother`, la courbe LOWESS (`smoother`, calculée si absente) est
+    superposée. Au‑delà de `density_threshold` points, le nuage est remplacé
+    par une carte de densité (hexbin), éventuellement complétée d'un
+    échantillon stratifié des points ; les statistiques portent toujours sur
+    toutes les données.
+    """
+    if stats is None:
+        stats = build_sufficient_stats(df[[x_col, y_col]])
+    pair = pair_statistics(stats, x_col, y_col)
+
     fig, ax = plt.subplots(figsize=(12, 8))
 
     x_data, y_data = df[x_col], df[y_col]
-    ax.scatter(
-        x_data,
-        y_data,
-        alpha=0.7,
-        color=marker_color,
-        s=marker_size,
-        edgecolors="white",
-        linewidth=0.5,
-    )
+    complete = x_data.notna() & y_data.notna()
+    x_values = x_data[complete].to_numpy(dtype=np.float64)
+    y_values = y_data[complete].to_numpy(dtype=np.float64)
+
+    if len(x_values) > density_threshold:
+        density = ax.hexbin(x_values, y_values, gridsize=80, bins="log", mincnt=1, cmap="Blues", rasterized=True)
+        fig.colorbar(density, ax=ax, label="Nombre de points (échelle log)")
+        if show_sample_points:
+            keep = stratified_sample(x_values, y_values)
+            ax.scatter(
+                x_values[keep],
+                y_values[keep],
+                alpha=0.5,
+                color=marker_color,
+                s=max(2, marker_size / 20),
+                linewidth=0,
+                rasterized=True,
+            )
+    else:
+        ax.scatter(
+            x_values,
+            y_values,
+            alpha=0.7,
+            color=marker_color,
+            s=marker_size,
+            edgecolors="white",
+            linewidth=0.5,
+        )
 
-    corr = x_data.corr(y_data)
-    r_squared = corr**2
+    corr = pair["r"]
+    r_squared = pair["r_squared"]
     slope = intercept = 0
 
     if add_trendline:
-        slope, intercept = np.polyfit(x_data, y_data, 1)
-        p = np.poly1d([slope, intercept])
+        slope, intercept = pair["slope"], pair["intercept"]
         x_trend = np.linspace(x_data.min(), x_data.max(), 100)
-        ax.plot(x_trend, p(x_trend), "--", color=line_color, linewidth=2, label=f"y = {slope:.3f}x + {intercept:.3f}")
+        ax.plot(x_trend, slope * x_trend + intercept, "--", color=line_color, linewidth=2, label=f"y = {slope:.3f}x + {intercept:.3f}")
+
+    if add_smoother and len(x_values) > 2:
+        if smoother is None:
+            smoother = binned_lowess(x_values, y_values, frac=smoother_frac)
+        ax.plot(smoother["x"], smoother["y"], "-", color="#2ca02c", linewidth=2.5, label=f"Lissage LOWESS (f = {smoother['frac']:.2f})")
+    else:
+        smoother = None
+
+    if add_trendline or smoother:
         ax.legend(loc="best", frameon=True, framealpha=0.8)
 
     ax.set_xlabel(x_label or x_col, fontsize=12)
     ax.set_ylabel(y_label or y_col, fontsize=12)
 
-    direction = "positive" if corr > 0 else "négative" if corr < 0 else "nulle"
-    strength = "faible" if abs(corr) < 0.3 else "modérée" if abs(corr) < 0.7 else "forte"
-    ax.set_title(f"{chart_title}\nCorrélation {strength} {direction} (r = {corr:.3f})", fontsize=14)
+    coef_label, coef = rank_coefficient or ("r", corr)
+    direction = "positive" if coef > 0 else "négative" if coef < 0 else "nulle"
+    strength = "faible" if abs(coef) < 0.3 else "modérée" if abs(coef) < 0.7 else "forte"
+    ax.set_title(f"{chart_title}\nCorrélation {strength} {direction} ({coef_label} = {coef:.3f})", fontsize=14)
 
     if show_grid:
         ax.grid(True, linestyle="--", alpha=0.3)
 
     if show_stats_box:
+        interval_text = ""
+        if intervals:
+            level = f"IC {100 * intervals['confidence']:.0f} %"
+            interval_text += f"\n{level} r (Fisher z) : [{intervals['r_fisher'][0]:.3f} ; {intervals['r_fisher'][1]:.3f}]"
+            if intervals["r_bootstrap"]:
+                low, high = intervals["r_bootstrap"]
+                interval_text += f"\n{level} r (bootstrap) : [{low:.3f} ; {high:.3f}]"
+            if intervals["slope_bootstrap"] and add_trendline:
+                low, high = intervals["slope_bootstrap"]
+                interval_text += f"\n{level} pente (bootstrap) : [{low:.3f} ; {high:.3f}]"
         stats_text = (
             f"r : {corr:.3f}\n"
             f"R² : {r_squared:.3f}\n"
-            f"N : {len(x_data)}"
+            f"N : {pair['n']}"
+            + (f"\n{rank_coefficient[0]} : {rank_coefficient[1]:.3f}" if rank_coefficient else "")
             + (f"\nRégression : y = {slope:.3f}x + {intercept:.3f}" if add_trendline else "")
+            + (f"\nNon‑linéarité : ΔR² = {smoother['gain']:.3f}" if smoother else "")
+            + interval_text
         )
         bbox = dict(boxstyle="round", facecolor="white", alpha=0.7)
         ax.text(0.05, 0.95, stats_text, transform=ax.transAxes, fontsize=11, va="top", bbox=bbox)
@@ -122,7 +1114,6 @@ def correlation_tool():
         )
 
     # ------------------- Session state --------------------------------------
-    st.session_state.setdefault("correlation_data", None)
     st.session_state.setdefault("correlation_x_column", None)
     st.session_state.setdefault("correlation_y_column", None)
     st.session_state.setdefault(
@@ -139,9 +1130,12 @@ def correlation_tool():
             "show_stats_box": True,
         },
     )
+    st.session_state.correlation_settings.setdefault("show_sample_points", True)
+    st.session_state.correlation_settings.setdefault("add_smoother", False)
+    st.session_state.correlation_settings.setdefault("smoother_frac", 0.3)
 
     # ------------------- Onglets --------------------------------------------
-    tab1, tab2, tab3 = st.tabs(["Données", "Visualisation", "Guide méthode"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Données", "Visualisation", "Régression multiple", "Guide méthode"])
 
     # ────────────────────────────────────────
     # Onglet 1 : Données
@@ -151,24 +1145,19 @@ def correlation_tool():
 
         input_method = st.radio(
             "Méthode d'entrée :",
-            ["Données d'exemple", "Saisie manuelle"],
+            ["Données d'exemple", "Saisie manuelle", "Importer un fichier"],
             horizontal=True,
         )
 
         df = None
+        known_fingerprint = None
 
         # ---------- Jeu d'exemple ----------
         if input_method == "Données d'exemple":
             st.markdown("#### Données d'exemple : variables process")
             with st.expander("Voir les données", expanded=True):
                 st.dataframe(st.session_state.demo_correlation_data.head(10), use_container_width=True)
-                st.markdown("##### Matrice de corrélation")
-                st.dataframe(
-                    st.session_state.demo_correlation_data.corr()
-                    .round(3)
-                    .style.background_gradient(cmap="coolwarm", axis=None, vmin=-1, vmax=1),
-                    use_container_width=True,
-                )
+                display_correlation_matrix(st.session_state.demo_correlation_data, "demo_correlation")
 
             relation = st.selectbox(
                 "Relation à analyser :",
@@ -192,7 +1181,18 @@ def correlation_tool():
                 st.session_state.correlation_settings["x_label"] = mapping[relation][0]
                 st.session_state.correlation_settings["y_label"] = mapping[relation][1]
 
-            df = st.session_state.demo_correlation_data.copy()
+            df = st.session_state.demo_correlation_data
+
+        # ---------- Import de fichier ----------
+        elif input_method == "Importer un fichier":
+            st.markdown("#### Importer un fichier")
+            uploaded = dataset_uploader("correlation_upload")
+            if uploaded is not None:
+                df, known_fingerprint = uploaded
+                with st.expander("Aperçu", expanded=True):
+                    st.dataframe(df.head(100), use_container_width=True)
+                    if df.select_dtypes(include=np.number).shape[1] > 1:
+                        display_correlation_matrix(df, "upload_correlation", known_fingerprint)
 
         # ---------- Saisie manuelle ----------
         else:
@@ -204,46 +1204,97 @@ def correlation_tool():
             data_input = st.text_area("Collez vos données CSV :", exemple_defaut, height=200)
             if data_input:
                 try:
-                    df = pd.read_csv(StringIO(data_input))
+                    # Lecture mise en cache : les réexécutions (curseurs, couleurs…) ne relisent pas le texte
+                    df, csv_format, known_fingerprint = cached_read_numeric_csv(text_fingerprint(data_input), data_input)
                     st.success("Données lues avec succès !")
+                    separator = {"\t": "tabulation"}.get(csv_format["separator"], f"« {csv_format['separator']} »")
+                    st.caption(
+                        f"Séparateur détecté : {separator} ; séparateur décimal : « {csv_format['decimal']} »."
+                    )
+                    if csv_format["dropped_columns"]:
+                        st.caption("Colonnes non numériques ignorées : " + ", ".join(map(str, csv_format["dropped_columns"])))
+                    if csv_format["coerced_cells"]:
+                        st.warning(f"{csv_format['coerced_cells']} cellule(s) non numérique(s) remplacée(s) par des valeurs manquantes.")
                     with st.expander("Aperçu", expanded=True):
                         st.dataframe(df, use_container_width=True)
-                        num_df = df.select_dtypes(include=np.number)
-                        if num_df.shape[1] > 1:
-                            st.markdown("##### Matrice de corrélation")
-                            st.dataframe(
-                                num_df.corr()
-                                .round(3)
-                                .style.background_gradient(cmap="coolwarm", axis=None, vmin=-1, vmax=1),
-                                use_container_width=True,
-                            )
+                        if df.shape[1] > 1:
+                            display_correlation_matrix(df, "manual_correlation", known_fingerprint)
                 except Exception as e:
                     st.error(f"Erreur de lecture : {e}")
 
         # ---------- Validation ----------
         if df is not None:
-            ok, msg = validate_correlation_data(df)
+            fingerprint = known_fingerprint or dataset_fingerprint(df)
+            ok, msg = validate_correlation_data(df, fingerprint)
             if not ok:
                 st.error(msg)
-                st.session_state.correlation_data = None
+                release_dataset(st.session_state, "correlation")
             else:
-                st.session_state.correlation_data = df
+                # Statistiques suffisantes : calculées au chargement, complétées si des lignes sont ajoutées
+                previous = dataset_view(st.session_state, "correlation")
+                df = register_dataset(st.session_state, "correlation", df, fingerprint)
+                cached = st.session_state.get("correlation_stats")
+                if cached is None or cached["fingerprint"] != fingerprint:
+                    if (
+                        cached is not None
+                        and previous is not None
+                        and list(previous.columns) == list(df.columns)
+                        and len(df) > len(previous)
+                        and df.iloc[: len(previous)].reset_index(drop=True).equals(previous.reset_index(drop=True))
+                    ):
+                        stats = append_rows(cached["stats"], df.iloc[len(previous) :])
+                    else:
+                        stats = build_sufficient_stats(df)
+                    st.session_state.correlation_stats = {"fingerprint": fingerprint, "stats": stats}
+
                 numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
 
                 # Variables personnalisées si nécessaire
                 if (
-                    input_method == "Saisie manuelle"
+                    input_method in ("Saisie manuelle", "Importer un fichier")
                     or (input_method == "Données d'exemple" and relation == "Variables personnalisées")
                 ):
+                    # Valeurs par défaut des sélecteurs (réinitialisées si le jeu de données change)
+                    if st.session_state.get("correlation_x_select") not in numeric_cols:
+                        st.session_state.correlation_x_select = numeric_cols[0]
+                    if st.session_state.get("correlation_y_select") not in numeric_cols:
+                        st.session_state.correlation_y_select = numeric_cols[min(1, len(numeric_cols) - 1)]
+
+                    with st.expander("Trouver les relations les plus fortes", expanded=False):
+                        c1, c2 = st.columns(2)
+                        with c1:
+                            top_k = st.number_input("Nombre de paires :", 1, 100, 10, key="correlation_top_k")
+                        with c2:
+                            top_method = st.radio(
+                                "Coefficient :", ["Pearson", "Spearman"], horizontal=True, key="correlation_top_method"
+                            )
+                        top_pairs = cached_top_correlated_pairs(fingerprint, df, int(top_k), top_method.lower())
+                        st.caption("Cliquez sur une ligne pour charger la paire dans le nuage de points.")
+                        selection = st.dataframe(
+                            top_pairs.round({"r": 3}),
+                            use_container_width=True,
+                            hide_index=True,
+                            on_select="rerun",
+                            selection_mode="single-row",
+                            key="correlation_top_pairs",
+                        )
+                        selected_rows = selection.selection.rows
+                        selected = (top_method, int(top_k), selected_rows[0]) if selected_rows else None
+                        if selected is not None and selected != st.session_state.get("correlation_top_applied"):
+                            pair_row = top_pairs.iloc[selected_rows[0]]
+                            st.session_state.correlation_x_select = pair_row["Variable X"]
+                            st.session_state.correlation_y_select = pair_row["Variable Y"]
+                        st.session_state.correlation_top_applied = selected
+
                     st.markdown("#### Sélection des variables")
                     col1, col2 = st.columns(2)
                     with col1:
                         st.session_state.correlation_x_column = st.selectbox(
-                            "Variable X :", numeric_cols, index=0
+                            "Variable X :", numeric_cols, key="correlation_x_select"
                         )
                     with col2:
                         st.session_state.correlation_y_column = st.selectbox(
-                            "Variable Y :", numeric_cols, index=min(1, len(numeric_cols) - 1)
+                            "Variable Y :", numeric_cols, key="correlation_y_select"
                         )
                     st.session_state.correlation_settings["chart_title"] = (
                         f"{st.session_state.correlation_x_column} vs {st.session_state.correlation_y_column}"
@@ -260,14 +1311,27 @@ def correlation_tool():
     with tab2:
         st.markdown("### Étape 2 : Visualisation")
 
-        if st.session_state.correlation_data is None:
+        # Seule l'empreinte est gardée en session : la vue est résolue à chaque exécution
+        df = dataset_view(st.session_state, "correlation")
+        if df is None:
             st.info("Veuillez d'abord choisir vos données dans l'onglet « Données ».")
         elif not (st.session_state.correlation_x_column and st.session_state.correlation_y_column):
             st.info("Veuillez sélectionner les variables X et Y dans l'onglet « Données ».")
         else:
-            df = st.session_state.correlation_data
             x_col = st.session_state.correlation_x_column
             y_col = st.session_state.correlation_y_column
+            source_df, source_y_col = df, y_col
+            fingerprint = st.session_state.correlation_stats["fingerprint"]
+            stats = st.session_state.correlation_stats["stats"]
+
+            # Paire décalée chargée depuis l'analyse des décalages
+            lag_state = st.session_state.get("correlation_lag")
+            lag = lag_state["lag"] if lag_state and lag_state["pair"] == (x_col, y_col) else 0
+            if lag:
+                df = shift_pair(source_df, x_col, source_y_col, lag)
+                y_col = df.columns[1]
+                stats = build_sufficient_stats(df)
+                fingerprint = f"{fingerprint}:{lag:+d}"
 
             with st.expander("Personnalisation du graphique", expanded=True):
                 col1, col2 = st.columns(2)
@@ -284,6 +1348,19 @@ def correlation_tool():
                     st.session_state.correlation_settings["add_trendline"] = st.checkbox(
                         "Afficher la droite de régression", st.session_state.correlation_settings["add_trendline"]
                     )
+                    st.session_state.correlation_settings["add_smoother"] = st.checkbox(
+                        "Afficher une courbe de lissage (LOWESS)",
+                        st.session_state.correlation_settings["add_smoother"],
+                        help="Régression locale : révèle une relation courbe que la droite ne capte pas.",
+                    )
+                    if st.session_state.correlation_settings["add_smoother"]:
+                        st.session_state.correlation_settings["smoother_frac"] = st.slider(
+                            "Largeur du lissage (part des points) :",
+                            0.1,
+                            0.9,
+                            st.session_state.correlation_settings["smoother_frac"],
+                            0.05,
+                        )
                 with col2:
                     st.session_state.correlation_settings["marker_size"] = st.slider(
                         "Taille des points :", 20, 100, st.session_state.correlation_settings["marker_size"], 5
@@ -300,54 +1377,307 @@ def correlation_tool():
                     st.session_state.correlation_settings["show_stats_box"] = st.checkbox(
                         "Afficher le panneau de stats", st.session_state.correlation_settings["show_stats_box"]
                     )
+                    st.session_state.correlation_settings["show_sample_points"] = st.checkbox(
+                        "Grand volume : superposer un échantillon des points",
+                        st.session_state.correlation_settings["show_sample_points"],
+                        help="Au‑delà de 20 000 points, le nuage est affiché sous forme de carte de densité.",
+                    )
+
+            method = st.radio(
+                "Coefficient de corrélation :",
+                ["Pearson", "Spearman", "Kendall (τ_b)"],
+                horizontal=True,
+                key="correlation_method",
+                help="Spearman et Kendall mesurent une relation monotone, même non linéaire, à partir des rangs.",
+            )
+            rank_coefficient = None
+            if method != "Pearson":
+                x_ranks = get_column_ranks(fingerprint, df, x_col)
+                y_ranks = get_column_ranks(fingerprint, df, y_col)
+                if method == "Spearman":
+                    rank_coefficient = ("ρ de Spearman", rank_correlation(x_ranks, y_ranks, "spearman"))
+                else:
+                    rank_coefficient = ("τ_b de Kendall", rank_correlation(x_ranks, y_ranks, "kendall"))
+
+            # --------- Intervalles de confiance ---------
+            pair = pair_statistics(stats, x_col, y_col)
+            c1, c2 = st.columns(2)
+            with c1:
+                confidence = st.select_slider(
+                    "Niveau de confiance :", [0.90, 0.95, 0.99], value=0.95, format_func=lambda v: f"{100 * v:.0f} %"
+                )
+            with c2:
+                run_bootstrap = st.checkbox(
+                    "Intervalles bootstrap (r et pente)",
+                    key="correlation_bootstrap",
+                    help="Rééchantillonnage des lignes : ne suppose pas la normalité des données.",
+                )
+            bootstrap = None
+            if run_bootstrap:
+                n_boot = st.select_slider("Nombre de rééchantillonnages :", [500, 1000, 2000, 5000], value=2000)
+                complete = df[[x_col, y_col]].dropna()
+                if len(complete) < 3:
+                    st.info("Au moins 3 lignes complètes sont nécessaires pour le bootstrap.")
+                else:
+                    with st.spinner("Rééchantillonnage en cours…"):
+                        bootstrap = cached_bootstrap_correlation(
+                            f"{fingerprint}|{x_col}|{y_col}",
+                            complete[x_col].to_numpy(dtype=np.float64),
+                            complete[y_col].to_numpy(dtype=np.float64),
+                            n_boot,
+                            confidence,
+                        )
+            intervals = correlation_intervals(pair, bootstrap, confidence)
+
+            # --------- Lissage et indicateur de non‑linéarité ---------
+            # Calculé seulement si la courbe ou le diagnostic est affiché, puis réutilisé depuis le cache
+            smoother = None
+            if st.session_state.correlation_settings["add_smoother"] or st.session_state.get("correlation_nonlinearity"):
+                complete = df[[x_col, y_col]].dropna()
+                if len(complete) > 2:
+                    frac = st.session_state.correlation_settings["smoother_frac"]
+                    smoother = cached_binned_lowess(
+                        f"{fingerprint}|{x_col}|{y_col}",
+                        complete[x_col].to_numpy(dtype=np.float64),
+                        complete[y_col].to_numpy(dtype=np.float64),
+                        frac,
+                    )
 
+            plot_settings = dict(st.session_state.correlation_settings)
+            if lag:
+                st.info(f"Paire décalée affichée : **{y_col}** associée à **{x_col}**.")
+                if plot_settings["y_label"] in (None, source_y_col):
+                    plot_settings["y_label"] = y_col
             fig = create_correlation_scatter(
                 df,
                 x_col,
                 y_col,
-                **st.session_state.correlation_settings,
+                stats=stats,
+                rank_coefficient=rank_coefficient,
+                intervals=intervals,
+                smoother=smoother,
+                **plot_settings,
             )
             st.pyplot(fig)
 
             # --------- Résumé ---------
-            corr = df[x_col].corr(df[y_col])
-            r_sq = corr**2
-            strength = "faible" if abs(corr) < 0.3 else "modérée" if abs(corr) < 0.7 else "forte"
-            direction = "positive" if corr > 0 else "négative" if corr < 0 else "nulle"
+            corr = pair["r"]
+            r_sq = pair["r_squared"]
+            coef_label, coef = rank_coefficient or ("Coefficient r", corr)
+            strength = "faible" if abs(coef) < 0.3 else "modérée" if abs(coef) < 0.7 else "forte"
+            direction = "positive" if coef > 0 else "négative" if coef < 0 else "nulle"
 
             with st.expander("Résumé de l'analyse", expanded=True):
                 c1, c2, c3 = st.columns(3)
-                c1.metric("Coefficient r", f"{corr:.3f}")
-                c2.metric("R²", f"{r_sq:.3f}")
+                c1.metric(coef_label, f"{coef:.3f}")
+                if rank_coefficient:
+                    c2.metric("r de Pearson", f"{corr:.3f}")
+                else:
+                    c2.metric("R²", f"{r_sq:.3f}")
                 c3.markdown(f"**Relation** : {strength.capitalize()} {direction}")
 
                 if st.session_state.correlation_settings["add_trendline"]:
-                    slope, intercept = np.polyfit(df[x_col], df[y_col], 1)
+                    slope, intercept = pair["slope"], pair["intercept"]
                     st.markdown(
                         f"**Équation** : y = {slope:.3f}x + {intercept:.3f}\n\n"
                         f"À chaque augmentation de 1 unité de **{x_col}**, "
                         f"**{y_col}** {'augmente' if slope > 0 else 'diminue'} en moyenne de {abs(slope):.3f}."
                     )
 
+                level = f"{100 * confidence:.0f} %"
+                low, high = intervals["r_fisher"]
+                interval_lines = [f"- r : [{low:.3f} ; {high:.3f}] (transformation z de Fisher)"]
+                if bootstrap:
+                    low, high = bootstrap["r"]
+                    interval_lines.append(f"- r : [{low:.3f} ; {high:.3f}] (bootstrap, {bootstrap['n_boot']} tirages)")
+                    low, high = bootstrap["slope"]
+                    interval_lines.append(f"- Pente : [{low:.3f} ; {high:.3f}] (bootstrap)")
+                st.markdown(f"**Intervalles de confiance à {level}** :\n" + "\n".join(interval_lines))
+                if intervals["r_fisher"][0] <= 0 <= intervals["r_fisher"][1]:
+                    st.warning("L'intervalle de confiance de r contient 0 : le lien n'est pas établi avec ces données.")
+
                 st.info(
                     f"La corrélation **{strength}** {direction} indique qu'environ {r_sq*100:.1f} % "
                     f"de la variation de **{y_col}** est expliquée par **{x_col}**."
                 )
 
+                st.checkbox(
+                    "Évaluer la forme de la relation (lissage LOWESS)",
+                    key="correlation_nonlinearity",
+                    help="Compare la droite à une courbe de lissage ; activé d'office avec la courbe LOWESS.",
+                )
+                if smoother:
+                    shape, advice = nonlinearity_verdict(smoother)
+                    message = (
+                        f"**Forme de la relation** : {shape} (R² droite = {smoother['linear_r_squared']:.3f}, "
+                        f"R² lissage = {smoother['r_squared']:.3f}). {advice}"
+                    )
+                    if shape == "non linéaire":
+                        st.warning(message)
+                    else:
+                        st.caption(message)
+
+            # --------- Décalages ---------
+            with st.expander("Analyse des décalages (données chronologiques)", expanded=False):
+                st.markdown(
+                    "Si les lignes sont ordonnées dans le temps, l'effet de X sur Y peut apparaître avec "
+                    "un retard de plusieurs cycles. La corrélation est calculée pour chaque décalage."
+                )
+                n_rows = len(source_df)
+                if n_rows < 4:
+                    st.info("Au moins 4 lignes sont nécessaires pour l'analyse des décalages.")
+                else:
+                    max_lag = st.slider(
+                        "Décalage maximal (lignes) :", 1, max(1, min(200, n_rows // 2)), min(10, max(1, n_rows // 4))
+                    )
+                    ccf = lagged_cross_correlation(
+                        source_df[x_col].to_numpy(dtype=np.float64),
+                        source_df[source_y_col].to_numpy(dtype=np.float64),
+                        max_lag,
+                    )
+                    if not ccf["r"].notna().any():
+                        st.info(
+                            "Corrélation indéfinie pour tous les décalages : une des colonnes est constante "
+                            "ou la série est trop courte pour ce décalage maximal."
+                        )
+                    else:
+                        st.pyplot(create_cross_correlation_chart(ccf, x_col, source_y_col))
+
+                        best = ccf.loc[ccf["r"].abs().idxmax()]
+                        best_lag = int(best["Décalage"])
+                        st.markdown(
+                            f"**Décalage de corrélation maximale** : {best_lag:+d} ligne(s), "
+                            f"r = {best['r']:.3f} (contre r = {ccf.loc[ccf['Décalage'] == 0, 'r'].iloc[0]:.3f} sans décalage)."
+                        )
+
+                        def _load_lag(value):
+                            st.session_state.correlation_lag = {"pair": (x_col, source_y_col), "lag": value}
+
+                        c1, c2 = st.columns(2)
+                        with c1:
+                            st.button(
+                                f"Charger la paire décalée ({best_lag:+d})",
+                                on_click=_load_lag,
+                                args=(best_lag,),
+                                disabled=best_lag == lag,
+                            )
+                        with c2:
+                            st.button("Revenir à la paire non décalée", on_click=_load_lag, args=(0,), disabled=lag == 0)
+
+            # --------- Matrice de nuages de points ---------
+            with st.expander("Matrice de nuages de points (toutes les paires)", expanded=False):
+                numeric_cols = source_df.select_dtypes(include=np.number).columns.tolist()
+                st.session_state.correlation_pair_plot_columns = [
+                    col for col in st.session_state.get("correlation_pair_plot_columns", numeric_cols[:6]) if col in numeric_cols
+                ]
+                pair_plot_columns = st.multiselect(
+                    "Variables à croiser :", numeric_cols, key="correlation_pair_plot_columns"
+                )
+                if len(pair_plot_columns) < 2:
+                    st.info("Sélectionnez au moins deux variables.")
+                else:
+                    if len(pair_plot_columns) > 12:
+                        st.caption("Au‑delà de 12 variables, les panneaux deviennent difficiles à lire.")
+                    matrix = cached_correlation_matrix(
+                        st.session_state.correlation_stats["fingerprint"], source_df, "pearson"
+                    )
+                    st.pyplot(create_pair_plot(source_df, pair_plot_columns, matrix))
+
             # --------- Export ---------
             st.markdown("#### Exporter")
-            col_png, col_pdf = st.columns(2)
+            col_png, col_pdf, col_csv = st.columns(3)
             with col_png:
                 png = export_as_png(fig)
                 st.download_button("Télécharger PNG", png, "correlation.png", "image/png")
             with col_pdf:
                 pdf = export_as_pdf(fig, st.session_state.correlation_settings["chart_title"])
                 st.download_button("Télécharger PDF", pdf, "correlation.pdf", "application/pdf")
+            with col_csv:
+                st.download_button(
+                    "Télécharger le résumé (CSV)",
+                    intervals_table(pair, intervals).to_csv(index=False).encode("utf-8"),
+                    "correlation_intervalles.csv",
+                    "text/csv",
+                )
 
     # ────────────────────────────────────────
-    # Onglet 3 : Guide méthode
+    # Onglet 3 : Régression multiple
     # ────────────────────────────────────────
     with tab3:
+        st.markdown("### Régression linéaire multiple")
+
+        df = dataset_view(st.session_state, "correlation")
+        if df is None:
+            st.info("Veuillez d'abord choisir vos données dans l'onglet « Données ».")
+        else:
+            numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+
+            response = st.selectbox("Variable à expliquer (Y) :", numeric_cols, key="regression_response")
+            candidates = [col for col in numeric_cols if col != response]
+            st.session_state.regression_predictors = [
+                col for col in st.session_state.get("regression_predictors", candidates) if col in candidates
+            ]
+            predictors = st.multiselect("Variables explicatives (X) :", candidates, key="regression_predictors")
+
+            if not predictors:
+                st.info("Sélectionnez au moins une variable explicative.")
+            else:
+                correlation_stats = st.session_state.correlation_stats
+                design = regression_design(
+                    correlation_stats["fingerprint"], df, correlation_stats["stats"], predictors + [response]
+                )
+                if design["n"] <= len(predictors) + 1:
+                    st.warning(
+                        f"Pas assez de lignes complètes ({design['n']}) pour estimer {len(predictors) + 1} coefficients."
+                    )
+                else:
+                    model = multiple_regression(design, response, predictors)
+
+                    c1, c2, c3, c4 = st.columns(4)
+                    c1.metric("R²", f"{model['r_squared']:.3f}")
+                    c2.metric("R² ajusté", f"{model['adj_r_squared']:.3f}")
+                    c3.metric("Écart‑type résiduel", f"{model['sigma']:.3f}")
+                    c4.metric("N (lignes complètes)", model["n"])
+
+                    terms = " ".join(f"{b:+.3f}·[{col}]" for b, col in zip(model["coef"], predictors))
+                    st.markdown(f"**Équation** : [{response}] = {model['intercept']:.3f} {terms}")
+
+                    st.dataframe(
+                        model["table"].style.format(
+                            {"Coefficient": "{:.4f}", "Erreur type": "{:.4f}", "t": "{:.2f}", "p‑valeur": "{:.4f}", "VIF": "{:.2f}"},
+                            na_rep="—",
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                    collinear = model["table"].loc[model["table"]["VIF"] > 10, "Terme"].tolist()
+                    if collinear:
+                        st.warning(
+                            "Forte colinéarité (VIF > 10) : " + ", ".join(collinear)
+                            + ". Les coefficients de ces variables sont instables ; envisagez d'en retirer une."
+                        )
+
+                    residual_fig = create_residual_plots(df, response, predictors, model)
+                    st.pyplot(residual_fig)
+
+                    st.markdown("#### Exporter")
+                    col_csv, col_png = st.columns(2)
+                    with col_csv:
+                        st.download_button(
+                            "Télécharger les coefficients (CSV)",
+                            model["table"].to_csv(index=False).encode("utf-8"),
+                            "regression_multiple.csv",
+                            "text/csv",
+                        )
+                    with col_png:
+                        st.download_button(
+                            "Télécharger les résidus (PNG)", export_as_png(residual_fig), "residus.png", "image/png"
+                        )
+
+    # ────────────────────────────────────────
+    # Onglet 4 : Guide méthode
+    # ────────────────────────────────────────
+    with tab4:
         st.markdown("### Guide d'analyse de corrélation")
 
         with st.expander("Qu'est‑ce que l'analyse de corrélation ?", expanded=True):
@@ -375,3 +1705,30 @@ def correlation_tool():
             - R² = 0,64 ⇒ 64 % de la variation expliquée
             """
             )
+
+        with st.expander("Corrélations de rang (Spearman, Kendall)", expanded=False):
+            st.markdown(
+                """
+            Lorsque la relation est **monotone mais non linéaire** (par exemple un taux de défauts qui
+            s'emballe au‑delà d'une température), r de Pearson sous‑estime le lien. Les coefficients de rang
+            comparent l'ordre des valeurs plutôt que les valeurs elles‑mêmes :
+
+            - **ρ de Spearman** : corrélation de Pearson calculée sur les rangs
+            - **τ_b de Kendall** : différence entre paires concordantes et discordantes, corrigée des ex‑æquo ;
+              plus robuste aux valeurs aberrantes et aux petits échantillons
+            """
+            )
+
+        with st.expander("Régression multiple et colinéarité", expanded=False):
+            st.markdown(
+                """
+            La **régression multiple** estime l'effet de chaque variable explicative **à niveau constant des
+            autres**. Chaque coefficient est accompagné de son erreur type et de sa p‑valeur (test de nullité).
+
+            Le **VIF** (facteur d'inflation de la variance) mesure la redondance d'une variable avec les autres :
+            au‑delà de 5, la colinéarité devient gênante ; au‑delà de 10, les coefficients sont instables.
+
+            Vérifiez enfin les **résidus** : ils doivent être centrés sur zéro, sans structure en fonction des
+            valeurs ajustées, et alignés sur la droite du graphique Q‑Q.
+            """
+            )
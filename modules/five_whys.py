@@ -5,40 +5,17 @@ import networkx as nx
 import uuid
 import pandas as pd
 from utils.export import export_as_png, export_as_pdf, export_as_csv
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Helper function: Vertical layout for tree structure
-# ─────────────────────────────────────────────────────────────────────────────
-def hierarchy_pos(G, root=None, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5):
-    '''
-    Custom hierarchy position for a tree layout.
-    '''
-    pos = {}
-    if root is None:
-        root = next(iter(nx.topological_sort(G)))  # assumes G is a DAG
-
-    def _hierarchy_pos(G, root, left, right, vert_loc, xcenter, pos, parent=None):
-        children = list(G.successors(root))
-        if not isinstance(children, list) or len(children) == 0:
-            pos[root] = (xcenter, vert_loc)
-        else:
-            dx = (right - left) / len(children)
-            nextx = left + dx / 2
-            for child in children:
-                pos = _hierarchy_pos(G, child, nextx - dx/2, nextx + dx/2, vert_loc - vert_gap, nextx, pos, root)
-                nextx += dx
-            pos[root] = (xcenter, vert_loc)
-        return pos
-
-    return _hierarchy_pos(G, root, 0, width, vert_loc, xcenter, pos)
+from utils.graph_layout import LEVEL_GAP, label_extent, tree_layout
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Create the 5 Why diagram
 # ─────────────────────────────────────────────────────────────────────────────
 def create_5why_diagram(problem, whys, root_cause=None, action=None):
-    """Retourne une figure Matplotlib représentant la chaîne 5 Pourquoi."""
+    """
+    Retourne une figure Matplotlib représentant la chaîne 5 Pourquoi, et la
+    mesure de sa disposition (dictionnaire seconds / cached, voir `tree_layout`).
+    """
     G = nx.DiGraph()
     G.add_node("problem", label=problem, node_type="problem")
 
@@ -62,42 +39,62 @@ def create_5why_diagram(problem, whys, root_cause=None, action=None):
             G.add_node(act_id, label=action, node_type="action")
             G.add_edge(node_id, act_id)
 
-    fig, ax = plt.subplots(figsize=(12, 8))
-    pos = hierarchy_pos(G)  # <-- ✅ Use custom hierarchy layout here
     labels = nx.get_node_attributes(G, "label")
     types = nx.get_node_attributes(G, "node_type")
+    extents = {n: label_extent(labels[n]) for n in G.nodes()}
 
-    colors, sizes = [], []
-    for n in G.nodes():
-        t = types.get(n, "why")
-        if t == "problem":
-            colors.append("#FF9999"); sizes.append(4000)
-        elif t == "root_cause":
-            colors.append("#FFCC99"); sizes.append(3500)
-        elif t == "action":
-            colors.append("#99FF99"); sizes.append(3500)
-        else:
-            colors.append("#ADD8E6"); sizes.append(3000)
-
-    nx.draw(
-        G, pos,
-        with_labels=True, labels=labels,
-        node_size=sizes, node_color=colors,
-        font_size=9, font_weight="bold",
-        arrows=True, arrowsize=15, ax=ax
+    positions, timing = tree_layout(
+        "problem",
+        {node: list(G.successors(node)) for node in G.nodes()},
+        {node: extent[1] for node, extent in extents.items()},
     )
+    order = list(positions)
+    row_height = max(height for _, _, height in extents.values()) + LEVEL_GAP
+    pos = {node: (x, -depth * row_height) for node, (x, depth) in positions.items()}
+
+    # Une unité du graphique vaut un pouce : les boîtes gardent la taille du texte
+    left = min(pos[n][0] - extents[n][1] / 2 for n in order) - 0.3
+    right = max(pos[n][0] + extents[n][1] / 2 for n in order) + 0.3
+    bottom = min(pos[n][1] - extents[n][2] / 2 for n in order) - 0.3
+    top = extents["problem"][2] / 2 + 0.3
+    fig_width = min(max(8, (right - left) / 0.96), 60)
+    fig_height = min(max(5, (top - bottom) / 0.78), 60)
+    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    fig.subplots_adjust(left=0.02, right=0.98, top=0.92, bottom=0.14)
+    center, half = (left + right) / 2, max(right - left, fig_width * 0.96) / 2
+    ax.set_xlim(center - half, center + half)
+    ax.set_ylim(top - max(top - bottom, fig_height * 0.78), top)
+    ax.axis("off")
+
+    colors = {"problem": "#FF9999", "root_cause": "#FFCC99", "action": "#99FF99", "why": "#ADD8E6"}
+    for src, tgt in G.edges():
+        ax.annotate(
+            "",
+            xy=(pos[tgt][0], pos[tgt][1] + extents[tgt][2] / 2),
+            xytext=(pos[src][0], pos[src][1] - extents[src][2] / 2),
+            arrowprops=dict(arrowstyle="-|>", color="dimgray", shrinkA=0, shrinkB=0, mutation_scale=15),
+        )
+    for node in order:
+        ax.text(
+            *pos[node],
+            extents[node][0],
+            ha="center",
+            va="center",
+            fontsize=9,
+            fontweight="bold",
+            bbox=dict(boxstyle="round,pad=0.4", facecolor=colors.get(types.get(node, "why"), "#ADD8E6"), edgecolor="gray"),
+        )
 
     plt.title("Analyse 5 Pourquoi", fontsize=16)
     legend = [
-        plt.Line2D([0], [0], marker="o", color="w", markerfacecolor="#FF9999", markersize=10, label="Problème"),
-        plt.Line2D([0], [0], marker="o", color="w", markerfacecolor="#ADD8E6", markersize=10, label="Pourquoi ?"),
-        plt.Line2D([0], [0], marker="o", color="w", markerfacecolor="#FFCC99", markersize=10, label="Cause racine"),
+        plt.Line2D([0], [0], marker="s", color="w", markerfacecolor="#FF9999", markersize=10, label="Problème"),
+        plt.Line2D([0], [0], marker="s", color="w", markerfacecolor="#ADD8E6", markersize=10, label="Pourquoi ?"),
+        plt.Line2D([0], [0], marker="s", color="w", markerfacecolor="#FFCC99", markersize=10, label="Cause racine"),
     ]
     if action and action.strip():
-        legend.append(plt.Line2D([0], [0], marker="o", color="w", markerfacecolor="#99FF99", markersize=10, label="Action"))
-    ax.legend(handles=legend, loc="upper center", bbox_to_anchor=(0.5, -0.05), ncol=4)
-    plt.tight_layout()
-    return fig
+        legend.append(plt.Line2D([0], [0], marker="s", color="w", markerfacecolor="#99FF99", markersize=10, label="Action"))
+    ax.legend(handles=legend, loc="upper center", bbox_to_anchor=(0.5, -0.02), ncol=4)
+    return fig, timing
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -178,8 +175,10 @@ def five_whys_tool():
                 "Décrire la mesure corrective",
                 height=80,
             )
-            if "why_levels" not in st.session_state or data_source == "Saisie manuelle":
+            # Remise à zéro seulement en arrivant en saisie manuelle : les ➕/➖ sont conservés
+            if st.session_state.get("why_levels_source") != data_source:
                 st.session_state.why_levels = [[""], [""], [""], [""], [""]]
+        st.session_state.why_levels_source = data_source
 
         def add_why(level):
             st.session_state.why_levels[level].append("")
@@ -222,13 +221,17 @@ def five_whys_tool():
         if not st.session_state.current_problem or st.session_state.current_problem == "Saisissez votre problème ici":
             st.info("Veuillez d'abord saisir vos données dans l'onglet « Données ».")
         else:
-            fig = create_5why_diagram(
+            fig, timing = create_5why_diagram(
                 st.session_state.current_problem,
                 st.session_state.why_levels,
                 st.session_state.current_root_cause,
                 st.session_state.current_action,
             )
             st.pyplot(fig)
+            st.caption(
+                f"Disposition : {1000 * timing['seconds']:.1f} ms"
+                + (" (réutilisée depuis le cache)" if timing["cached"] else "")
+            )
 
             with st.expander("Résumé", expanded=True):
                 data = [["Problème", st.session_state.current_problem]]
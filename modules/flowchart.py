@@ -1,40 +1,32 @@
 # -*- coding: utf-8 -*-
+import base64
+import html
+import math
+import textwrap
+
 import streamlit as st
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 import pandas as pd
+from utils.data import dataset_uploader
 from utils.export import export_as_pdf, export_as_png  # export_as_csv non utilisé
+from utils.graph_layout import graph_layout
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Helper: Création d'une position hiérarchique sans pygraphviz
-# ─────────────────────────────────────────────────────────────────────────────
-def hierarchy_pos(G, root=None, width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5):
-    '''
-    Génère une position de graphe en disposition verticale (hiérarchique).
-    '''
-    pos = {}
-    if root is None:
-        root = next(iter(nx.topological_sort(G)))
-
-    def _hierarchy_pos(G, root, left, right, vert_loc, xcenter, pos, parent=None):
-        children = list(G.successors(root))
-        if not isinstance(children, list) or len(children) == 0:
-            pos[root] = (xcenter, vert_loc)
-        else:
-            dx = (right - left) / len(children)
-            nextx = left + dx/2
-            for child in children:
-                pos = _hierarchy_pos(G, child, nextx - dx/2, nextx + dx/2, vert_loc - vert_gap, nextx, pos, root)
-                nextx += dx
-            pos[root] = (xcenter, vert_loc)
-        return pos
-
-    return _hierarchy_pos(G, root, 0, width, vert_loc, xcenter, pos)
+MATPLOTLIB_MAX_NODES = 150
+NODE_COLORS = {
+    "start": "lightgreen",
+    "end": "salmon",
+    "decision": "lightyellow",
+    "process": "lightblue",
+    "input": "lightpink",
+    "output": "lightgray",
+}
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Génération du logigramme
 # ─────────────────────────────────────────────────────────────────────────────
-def create_flowchart(nodes, edges, node_types):
+def create_flowchart(nodes, edges, node_types, edge_labels=None):
     """Retourne une figure Matplotlib représentant le logigramme."""
     G = nx.DiGraph()
     for nid, lbl in nodes.items():
@@ -42,19 +34,16 @@ def create_flowchart(nodes, edges, node_types):
     for src, tgt in edges:
         G.add_edge(src, tgt)
 
-    fig, ax = plt.subplots(figsize=(12, 10))
-    pos = hierarchy_pos(G)  # ✅ Utilisation du layout hiérarchique
+    node_ids, edge_list = list(G.nodes()), list(G.edges())
+    (pos, back_edges, _), _ = graph_layout(node_ids, edge_list)
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    fig, ax = plt.subplots(
+        figsize=(min(max(12, 1.6 * (max(xs) - min(xs) + 1)), 60), min(max(10, 1.2 * (max(ys) - min(ys) + 1)), 60))
+    )
     labels = nx.get_node_attributes(G, "label")
     types = nx.get_node_attributes(G, "type")
 
-    color_map = {
-        "start": "lightgreen",
-        "end": "salmon",
-        "decision": "lightyellow",
-        "process": "lightblue",
-        "input": "lightpink",
-        "output": "lightgray",
-    }
     shape_map = {
         "start": "o",
         "end": "o",
@@ -71,20 +60,430 @@ def create_flowchart(nodes, edges, node_types):
                 G,
                 pos,
                 nodelist=nodes_t,
-                node_color=[color_map[t]] * len(nodes_t),
+                node_color=[NODE_COLORS[t]] * len(nodes_t),
                 node_shape=shape,
                 node_size=3000,
                 ax=ax,
             )
 
-    nx.draw_networkx_edges(G, pos, arrows=True, arrowsize=15, ax=ax)
+    forward = [e for e in edge_list if e not in back_edges]
+    nx.draw_networkx_edges(G, pos, edgelist=forward, arrows=True, arrowsize=15, node_size=3000, ax=ax)
+    if back_edges:
+        # Boucles de reprise : arcs courbes pour ne pas se superposer au flux principal
+        nx.draw_networkx_edges(
+            G,
+            pos,
+            edgelist=[e for e in edge_list if e in back_edges],
+            arrows=True,
+            arrowsize=15,
+            node_size=3000,
+            connectionstyle="arc3,rad=0.8",
+            style="dashed",
+            edge_color="dimgray",
+            ax=ax,
+        )
     nx.draw_networkx_labels(G, pos, labels, font_size=9, font_weight="bold", ax=ax)
+    if edge_labels:
+        nx.draw_networkx_edge_labels(
+            G,
+            pos,
+            edge_labels={e: lbl for e, lbl in edge_labels.items() if e in forward},
+            font_size=8,
+            node_size=3000,
+            ax=ax,
+        )
+
+    # Marges fixes : un logigramme étroit n'est pas étiré sur toute la largeur
+    half_width = max((max(xs) - min(xs)) / 2 + 0.8, 3)
+    ax.set_xlim((max(xs) + min(xs)) / 2 - half_width, (max(xs) + min(xs)) / 2 + half_width)
+    ax.set_ylim(min(ys) - 0.6, max(ys) + 0.6)
 
     plt.title("Logigramme (Flowchart)", fontsize=16)
     plt.axis("off")
     plt.tight_layout()
     return fig
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Rendu vectoriel (SVG) : formes ISO 5807 et arcs orthogonaux
+# ─────────────────────────────────────────────────────────────────────────────
+SVG_FONT_SIZE = 12
+SVG_CHAR_WIDTH = 7.2   # px par caractère à 12 px
+SVG_LINE_HEIGHT = 15
+SVG_LABEL_WRAP = 22    # caractères par ligne
+
+def svg_node_size(label, node_type):
+    """Retourne (lignes du libellé, largeur, hauteur) en pixels de la forme d'un nœud."""
+    lines = textwrap.wrap(str(label), SVG_LABEL_WRAP) or [""]
+    width = max(len(line) for line in lines) * SVG_CHAR_WIDTH + 24
+    height = len(lines) * SVG_LINE_HEIGHT + 16
+    if node_type == "decision":
+        # Le texte doit tenir dans le losange inscrit
+        width, height = width * 1.5, height * 1.7
+    elif node_type in ("input", "output"):
+        width += 0.8 * height
+    elif node_type in ("start", "end"):
+        width += height / 2
+    return lines, width, height
+
+def svg_node_shape(node_type, cx, cy, width, height, fill):
+    """Élément SVG de la forme ISO 5807 d'un nœud centré en (cx, cy)."""
+    left, top = cx - width / 2, cy - height / 2
+    style = f'fill="{fill}" stroke="#444" stroke-width="1.2"'
+    if node_type in ("start", "end"):
+        # Terminaison : rectangle aux extrémités arrondies
+        return f'<rect x="{left:.1f}" y="{top:.1f}" width="{width:.1f}" height="{height:.1f}" rx="{height / 2:.1f}" {style}/>'
+    if node_type == "decision":
+        points = f"{cx:.1f},{top:.1f} {left + width:.1f},{cy:.1f} {cx:.1f},{top + height:.1f} {left:.1f},{cy:.1f}"
+        return f'<polygon points="{points}" {style}/>'
+    if node_type in ("input", "output"):
+        # Données : parallélogramme
+        skew = 0.4 * height
+        points = (
+            f"{left + skew:.1f},{top:.1f} {left + width:.1f},{top:.1f} "
+            f"{left + width - skew:.1f},{top + height:.1f} {left:.1f},{top + height:.1f}"
+        )
+        return f'<polygon points="{points}" {style}/>'
+    return f'<rect x="{left:.1f}" y="{top:.1f}" width="{width:.1f}" height="{height:.1f}" {style}/>'
+
+def render_flowchart_svg(nodes, edges, node_types, edge_labels=None):
+    """
+    Dessine le logigramme directement en SVG, sans Matplotlib.
+
+    Les nœuds prennent la forme ISO 5807 de leur type et la taille de leur
+    libellé ; les arcs sont routés à angle droit dans les couloirs entre
+    couches, en passant par les points de passage réservés par la
+    disposition en couches pour les arcs longs. Les boucles de reprise
+    sont en pointillés. Les libellés d'arcs (`edge_labels`, dictionnaire
+    (source, cible) -> texte) sont posés au premier coude de l'arc. Le
+    texte est produit en une passe, ce qui reste rapide pour plusieurs
+    milliers de nœuds.
+
+    Retourne le document SVG (str) et la mesure de la disposition
+    (dictionnaire seconds / cached, voir `graph_layout`).
+    """
+    node_ids = list(dict.fromkeys([*nodes, *(n for edge in edges for n in edge)]))
+    edge_list = list(dict.fromkeys(edges))
+    (pos, back_edges, bends), timing = graph_layout(node_ids, edge_list)
+
+    shapes = {n: svg_node_size(nodes.get(n, n), node_types.get(n, "process")) for n in node_ids}
+    column = max(width for _, width, _ in shapes.values()) + 30
+    row = max(height for _, _, height in shapes.values()) + 60
+    min_x = min(x for x, _ in pos.values())
+    margin = 20
+
+    def to_px(x, y):
+        return margin + column / 2 + (x - min_x) * column, margin + row / 2 - y * row
+
+    centers = {n: to_px(*pos[n]) for n in node_ids}
+    edge_labels = edge_labels or {}
+    width = max(cx for cx, _ in centers.values()) + column / 2 + margin + (60 if edge_labels else 0)
+    height = max(cy for _, cy in centers.values()) + row / 2 + margin
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="DejaVu Sans, Arial, sans-serif" font-size="{SVG_FONT_SIZE}">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+        'orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="#444"/></marker></defs>',
+        '<rect width="100%" height="100%" fill="white"/>',
+        '<g fill="none" stroke="#444" stroke-width="1.2">',
+    ]
+    label_parts = []
+    for src, tgt in edge_list:
+        (sx, sy), (tx, ty) = centers[src], centers[tgt]
+        label = edge_labels.get((src, tgt))
+        if src == tgt:
+            # Boucle sur une même étape : petit arc sur le côté droit
+            right = sx + shapes[src][1] / 2
+            parts.append(
+                f'<path d="M{right:.1f},{sy - 6:.1f} C{right + 30:.1f},{sy - 30:.1f} {right + 30:.1f},{sy + 30:.1f} '
+                f'{right:.1f},{sy + 6:.1f}" marker-end="url(#arrow)"/>'
+            )
+            if label:
+                label_parts.append(f'<text x="{right + 24:.1f}" y="{sy - 26:.1f}">{html.escape(str(label))}</text>')
+            continue
+        right_src, right_tgt = sx + shapes[src][1] / 2, tx + shapes[tgt][1] / 2
+        if (src, tgt) in back_edges and (src, tgt) not in bends:
+            # Boucle courte : couloir à droite des deux étapes, pour ne pas recouvrir l'arc aller
+            lane = max(right_src, right_tgt) + 15
+            points = [(right_src, sy), (lane, sy), (lane, ty), (right_tgt, ty)]
+        elif (src, tgt) in back_edges:
+            # Boucle longue : par les points de passage réservés, en sortant et entrant par le côté
+            route = [to_px(*bend) for bend in bends[(src, tgt)]]
+            first_x, last_x = route[0][0], route[-1][0]
+            points = [(sx + math.copysign(shapes[src][1] / 2, first_x - sx), sy), (first_x, sy)]
+            for (x1, y1), (x2, y2) in zip(route, route[1:]):
+                channel = (y1 + y2) / 2
+                points += [(x1, channel), (x2, channel)]
+            points += [(last_x, ty), (tx + math.copysign(shapes[tgt][1] / 2, last_x - tx), ty)]
+        else:
+            waypoints = [(sx, sy), *(to_px(*bend) for bend in bends.get((src, tgt), [])), (tx, ty)]
+            downward = ty > sy
+            half_src, half_tgt = shapes[src][2] / 2, shapes[tgt][2] / 2
+            points = [(sx, sy + half_src if downward else sy - half_src)]
+            for (x1, y1), (x2, y2) in zip(waypoints, waypoints[1:]):
+                channel = (y1 + y2) / 2
+                points += [(x1, channel), (x2, channel)]
+            points.append((tx, ty - half_tgt if downward else ty + half_tgt))
+        path = " ".join(f"{x:.1f},{y:.1f}" for i, (x, y) in enumerate(points) if i == 0 or (x, y) != points[i - 1])
+        dash = ' stroke-dasharray="5,4" stroke="#777"' if (src, tgt) in back_edges else ""
+        parts.append(f'<polyline points="{path}" marker-end="url(#arrow)"{dash}/>')
+        if label:
+            # Arc aller : au coude sous la source ; boucle : au milieu du trajet
+            lx, ly = points[2] if (src, tgt) not in back_edges else points[len(points) // 2]
+            label_parts.append(f'<text x="{lx + 4:.1f}" y="{ly - 4:.1f}">{html.escape(str(label))}</text>')
+    parts.append("</g>")
+    if label_parts:
+        parts.append('<g font-size="10" fill="#555" stroke="white" stroke-width="3" paint-order="stroke">')
+        parts += label_parts
+        parts.append("</g>")
+
+    for node in node_ids:
+        lines, w, h = shapes[node]
+        node_type = node_types.get(node, "process")
+        cx, cy = centers[node]
+        parts.append(svg_node_shape(node_type, cx, cy, w, h, NODE_COLORS.get(node_type, "lightblue")))
+        first = cy - (len(lines) - 1) * SVG_LINE_HEIGHT / 2
+        spans = "".join(
+            f'<tspan x="{cx:.1f}" y="{first + i * SVG_LINE_HEIGHT:.1f}">{html.escape(line)}</tspan>'
+            for i, line in enumerate(lines)
+        )
+        parts.append(f'<text text-anchor="middle" dominant-baseline="central" font-weight="bold">{spans}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts), timing
+
+def svg_inline_image(svg, max_height=800):
+    """Balise HTML affichant le SVG comme image intégrée (data URI), avec défilement pour les grands logigrammes."""
+    data = base64.b64encode(svg.encode("utf-8")).decode("ascii")
+    return (
+        f'<div style="overflow:auto; max-height:{max_height}px; border:1px solid #eee">'
+        f'<img src="data:image/svg+xml;base64,{data}" style="max-width:none" alt="Logigramme"/></div>'
+    )
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Import d'un journal d'événements (process mining)
+# ─────────────────────────────────────────────────────────────────────────────
+def event_timestamps(column):
+    """
+    Convertit la colonne d'horodatage en tableau numérique triable.
+
+    Retourne (valeurs int64 en nanosecondes ou float, facteur vers les
+    secondes ou None si la colonne est numérique sans unité connue, masque
+    des valeurs valides).
+    """
+    if not pd.api.types.is_numeric_dtype(column):
+        values = pd.to_datetime(column, errors="coerce")
+        if getattr(values.dtype, "tz", None) is not None:
+            values = values.dt.tz_convert(None)
+        stamps = values.to_numpy("datetime64[ns]")
+        return stamps.view("int64"), 1e-9, ~np.isnat(stamps)
+    stamps = pd.to_numeric(column, errors="coerce").to_numpy("float64", na_value=np.nan)
+    return stamps, None, ~np.isnan(stamps)
+
+def directly_follows(case_ids, activities, timestamps):
+    """
+    Graphe « directement suivi » d'un journal d'événements.
+
+    Les événements sont triés une fois par (cas, horodatage), sauf s'ils le
+    sont déjà ; chaque événement est comparé à son successeur décalé d'un
+    rang dans le même cas. Les paires (activité, activité suivante) sont
+    codées par un entier et agrégées en une passe groupée (effectif et
+    durée médiane), sans boucle Python.
+
+    Returns:
+        tuple: (activités : DataFrame Activité / Fréquence / Débuts / Fins,
+        transitions : DataFrame De / À / Fréquence / Durée médiane,
+        nombre de cas, facteur vers les secondes ou None)
+    """
+    stamps, to_seconds, valid = event_timestamps(timestamps)
+    case_codes = pd.factorize(case_ids)[0]
+    activity_codes, names = pd.factorize(activities)
+    valid &= (case_codes >= 0) & (activity_codes >= 0)
+    if not valid.all():
+        case_codes, activity_codes, stamps = case_codes[valid], activity_codes[valid], stamps[valid]
+    if not len(case_codes):
+        raise ValueError("aucun événement avec un cas, une activité et un horodatage valides")
+
+    # Un journal exporté cas par cas et dans l'ordre chronologique n'est pas retrié
+    same_case = case_codes[1:] == case_codes[:-1]
+    if not np.all((case_codes[1:] > case_codes[:-1]) | (same_case & (stamps[1:] >= stamps[:-1]))):
+        order = np.lexsort((stamps, case_codes))
+        case_codes, activity_codes, stamps = case_codes[order], activity_codes[order], stamps[order]
+        same_case = case_codes[1:] == case_codes[:-1]
+
+    n_activities = len(names)
+    pairs = activity_codes[:-1][same_case].astype(np.int64) * n_activities + activity_codes[1:][same_case]
+    durations = (stamps[1:] - stamps[:-1])[same_case]
+    grouped = pd.Series(durations).groupby(pairs).agg(["size", "median"])
+
+    first, last = np.r_[True, ~same_case], np.r_[~same_case, True]
+    names = np.asarray(names, dtype=object)
+    activity_table = pd.DataFrame({
+        "Activité": names,
+        "Fréquence": np.bincount(activity_codes, minlength=n_activities),
+        "Débuts": np.bincount(activity_codes[first], minlength=n_activities),
+        "Fins": np.bincount(activity_codes[last], minlength=n_activities),
+    })
+    codes = grouped.index.to_numpy()
+    transitions = pd.DataFrame({
+        "De": names[codes // n_activities],
+        "À": names[codes % n_activities],
+        "Fréquence": grouped["size"].to_numpy(),
+        "Durée médiane": grouped["median"].to_numpy() * (to_seconds or 1),
+    }).sort_values("Fréquence", ascending=False, ignore_index=True)
+    return activity_table, transitions, int(first.sum()), to_seconds
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_directly_follows(fingerprint, _df, case_column, activity_column, time_column):
+    """Graphe « directement suivi » mis en cache par empreinte du journal et colonnes choisies."""
+    return directly_follows(_df[case_column], _df[activity_column], _df[time_column])
+
+def format_duration(seconds, in_seconds=True):
+    """Durée lisible (s, min, h, j) ; valeur brute si l'horodatage n'a pas d'unité."""
+    if not in_seconds:
+        return f"{seconds:.4g}"
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        hours, minutes = divmod(int(seconds) // 60, 60)
+        return f"{hours} h {minutes:02d}"
+    return f"{seconds / 86400:.1f} j".replace(".", ",")
+
+def format_count(value):
+    """Entier avec espaces insécables comme séparateurs de milliers."""
+    return f"{int(value):,}".replace(",", " ")
+
+def event_log_flowchart(activity_table, transitions, min_frequency=1, in_seconds=True):
+    """
+    Convertit le graphe « directement suivi » en nœuds, types, arcs et
+    libellés d'arcs du logigramme, en ne gardant que les transitions
+    observées au moins `min_frequency` fois.
+
+    Les activités deviennent des étapes « process » (identifiants A1, A2…
+    par fréquence décroissante), reliées à une étape de début et de fin
+    selon les premières et dernières activités des cas.
+    """
+    ranked = activity_table.sort_values("Fréquence", ascending=False, ignore_index=True)
+    ids = {name: f"A{i + 1}" for i, name in enumerate(ranked["Activité"])}
+    edges, edge_labels = [], {}
+    for row in ranked.itertuples(index=False):
+        if row.Débuts >= min_frequency:
+            edges.append(("start", ids[row.Activité]))
+            edge_labels[edges[-1]] = format_count(row.Débuts)
+    kept = transitions[transitions["Fréquence"] >= min_frequency]
+    for src, tgt, count, median in zip(kept["De"], kept["À"], kept["Fréquence"], kept["Durée médiane"]):
+        edges.append((ids[src], ids[tgt]))
+        edge_labels[edges[-1]] = f"{format_count(count)} · {format_duration(median, in_seconds)}"
+    for row in ranked.itertuples(index=False):
+        if row.Fins >= min_frequency:
+            edges.append((ids[row.Activité], "end"))
+            edge_labels[edges[-1]] = format_count(row.Fins)
+
+    linked = {n for edge in edges for n in edge}
+    nodes = {"start": "Début"}
+    nodes.update(
+        (ids[row.Activité], f"{row.Activité} ({format_count(row.Fréquence)})")
+        for row in ranked.itertuples(index=False)
+        if ids[row.Activité] in linked
+    )
+    nodes["end"] = "Fin"
+    node_types = {nid: "start" if nid == "start" else "end" if nid == "end" else "process" for nid in nodes}
+    return nodes, node_types, edges, edge_labels
+
+def guess_column(columns, hints, default):
+    """Indice de la première colonne dont le nom contient un des indices, sinon `default`."""
+    for i, name in enumerate(columns):
+        if any(hint in str(name).lower() for hint in hints):
+            return i
+    return min(default, len(columns) - 1)
+
+def load_flowchart(nodes, node_types, edges, edge_labels):
+    """Remplace le logigramme en cours et réinitialise les éditeurs de nœuds et de connexions."""
+    st.session_state.flowchart_nodes = nodes
+    st.session_state.flowchart_node_types = node_types
+    st.session_state.flowchart_edges = edges
+    st.session_state.flowchart_edge_labels = edge_labels
+    for key in ("node_editor", "edge_editor"):
+        st.session_state.pop(key, None)
+
+def event_log_importer():
+    """Import d'un journal d'événements et construction du graphe « directement suivi »."""
+    st.markdown(
+        "Chaque ligne est un événement : identifiant de cas (ordre de fabrication, lot…), "
+        "activité et horodatage. Le logigramme est reconstruit à partir des enchaînements observés."
+    )
+    # Cas et activités en catégories, horodatages analysés à la lecture
+    uploaded = dataset_uploader("flowchart_log", max_megabytes=2048, categorical=True, parse_dates=True)
+    if uploaded is None:
+        return
+    log, fingerprint = uploaded
+    columns = list(log.columns)
+    if len(columns) < 3:
+        st.info("Le journal doit comporter au moins trois colonnes : cas, activité et horodatage.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        case_column = st.selectbox(
+            "Cas :", columns, index=guess_column(columns, ("case", "cas", "ordre", "lot"), 0), key="flowchart_log_case"
+        )
+    with col2:
+        activity_column = st.selectbox(
+            "Activité :", columns, index=guess_column(columns, ("activ", "étape", "etape", "opération"), 1),
+            key="flowchart_log_activity",
+        )
+    with col3:
+        time_column = st.selectbox(
+            "Horodatage :", columns, index=guess_column(columns, ("time", "date", "horodat", "heure"), 2),
+            key="flowchart_log_time",
+        )
+
+    try:
+        with st.spinner("Calcul des enchaînements…"):
+            activity_table, transitions, n_cases, to_seconds = cached_directly_follows(
+                fingerprint, log, case_column, activity_column, time_column
+            )
+    except ValueError as e:
+        st.error(f"Journal inutilisable : {e}")
+        return
+
+    n_events = int(activity_table["Fréquence"].sum())
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Événements", format_count(n_events))
+    m2.metric("Cas", format_count(n_cases))
+    m3.metric("Activités", format_count(len(activity_table)))
+    m4.metric("Transitions distinctes", format_count(len(transitions)))
+    if n_events < len(log):
+        st.warning(
+            f"{format_count(len(log) - n_events)} événement(s) ignoré(s) (cas, activité ou horodatage manquant ou illisible)."
+        )
+    if to_seconds is None:
+        st.caption("Horodatage numérique : les durées médianes sont exprimées dans l'unité de la colonne.")
+
+    max_count = int(max(transitions["Fréquence"].max() if len(transitions) else 1, activity_table["Débuts"].max()))
+    min_frequency = st.slider(
+        "Fréquence minimale des transitions :",
+        1,
+        max(max_count, 2),
+        1,
+        key="flowchart_log_threshold",
+        help="Les enchaînements plus rares sont masqués pour faire ressortir le flux principal.",
+    )
+    nodes, node_types, edges, edge_labels = event_log_flowchart(
+        activity_table, transitions, min_frequency, in_seconds=to_seconds is not None
+    )
+    st.caption(
+        f"{len(nodes) - 2} activités et {len(edges)} transitions conservées "
+        f"(libellés des arcs : fréquence · durée médiane)."
+    )
+    st.button(
+        "Remplacer le logigramme par ce graphe",
+        on_click=load_flowchart,
+        args=(nodes, node_types, edges, edge_labels),
+        disabled=len(nodes) <= 2,
+    )
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Interface utilisateur Streamlit pour le Flowchart
 # ─────────────────────────────────────────────────────────────────────────────
@@ -100,7 +499,7 @@ def flowchart_tool():
 
     **Instructions :**  
     1. Définissez les nœuds (étapes) du logigramme  
-    2. Reliez‑les pour créer le flux  
+    2. Reliez‑les pour créer le flux, ou importez un journal d'événements  
     3. Visualisez et exportez votre logigramme
     """
     )
@@ -148,6 +547,15 @@ def flowchart_tool():
             ("output", "process5"),
             ("process5", "end"),
         ]
+        st.session_state.demo_flowchart_edge_labels = {
+            ("decision1", "process2"): "Oui",
+            ("decision1", "end"): "Non",
+            ("decision2", "process3"): "Oui",
+            ("decision2", "end"): "Non",
+        }
+
+    with st.expander("Importer un journal d'événements (process mining)"):
+        event_log_importer()
 
     st.markdown("### Éditeur de logigramme")
 
@@ -189,37 +597,57 @@ def flowchart_tool():
     st.subheader("Connexions")
     if "flowchart_edges" not in st.session_state:
         st.session_state.flowchart_edges = st.session_state.demo_flowchart_edges.copy()
+        st.session_state.flowchart_edge_labels = st.session_state.demo_flowchart_edge_labels.copy()
 
-    edge_df = pd.DataFrame([{"De": s, "À": t} for s, t in st.session_state.flowchart_edges])
+    previous_labels = st.session_state.get("flowchart_edge_labels", {})
+    edge_df = pd.DataFrame(
+        [{"De": s, "À": t, "Libellé": previous_labels.get((s, t), "")} for s, t in st.session_state.flowchart_edges],
+        columns=["De", "À", "Libellé"],
+    )
     edited_edges = st.data_editor(edge_df, key="edge_editor", use_container_width=True, num_rows="dynamic")
 
-    edges = []
+    edges, edge_labels = [], {}
     for _, row in edited_edges.iterrows():
         src, tgt = row["De"], row["À"]
         if src and tgt and not pd.isna(src) and not pd.isna(tgt):
             edges.append((src, tgt))
+            if row["Libellé"] and not pd.isna(row["Libellé"]):
+                edge_labels[(src, tgt)] = row["Libellé"]
 
     # Sauvegarde dans la session
     st.session_state.flowchart_nodes = nodes
     st.session_state.flowchart_node_types = node_types
     st.session_state.flowchart_edges = edges
+    st.session_state.flowchart_edge_labels = edge_labels
 
     # ---------- Visualisation ----------
     if nodes and edges:
         st.subheader("Visualisation du logigramme")
-        fig = create_flowchart(nodes, edges, node_types)
-        st.pyplot(fig)
+        svg, timing = render_flowchart_svg(nodes, edges, node_types, edge_labels)
+        st.markdown(svg_inline_image(svg), unsafe_allow_html=True)
+        st.caption(
+            f"Disposition : {1000 * timing['seconds']:.1f} ms"
+            + (" (réutilisée depuis le cache)" if timing["cached"] else "")
+        )
 
         st.markdown("---")
         st.subheader("Exporter")
 
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
-            png = export_as_png(fig)
-            st.download_button("PNG", png, "logigramme.png", "image/png")
-        with col2:
-            pdf = export_as_pdf(fig, "Logigramme")
-            st.download_button("PDF", pdf, "logigramme.pdf", "application/pdf")
+            st.download_button("SVG", svg, "logigramme.svg", "image/svg+xml")
+        # Les exports raster passent par Matplotlib : réservés aux logigrammes de taille raisonnable
+        if len(nodes) <= MATPLOTLIB_MAX_NODES:
+            fig = create_flowchart(nodes, edges, node_types, edge_labels)
+            with col2:
+                png = export_as_png(fig)
+                st.download_button("PNG", png, "logigramme.png", "image/png")
+            with col3:
+                pdf = export_as_pdf(fig, "Logigramme")
+                st.download_button("PDF", pdf, "logigramme.pdf", "application/pdf")
+        else:
+            with col2:
+                st.caption(f"Au‑delà de {MATPLOTLIB_MAX_NODES} étapes, seul l'export SVG est proposé.")
 
     # ---------- Légende ----------
     st.markdown("---")
@@ -229,7 +657,7 @@ def flowchart_tool():
     with col_l:
         st.markdown(
             """
-        - **Début / Fin (ovale)**
+        - **Début / Fin (rectangle arrondi)**
         - **Processus (rectangle)**
         - **Décision (losange)**
         """
@@ -237,9 +665,9 @@ def flowchart_tool():
     with col_r:
         st.markdown(
             """
-        - **Entrée (triangle haut)**
-        - **Sortie (triangle bas)**
-        - **Flèches** : direction du flux
+        - **Entrée / Sortie (parallélogramme)**
+        - **Flèches** : direction du flux
+        - **Pointillés** : boucle de reprise
         """
         )
 
@@ -3,34 +3,44 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from utils.data import (
+    compile_schema,
+    dataset_column,
+    dataset_fingerprint,
+    dataset_uploader,
+    dataset_view,
+    register_dataset,
+)
 from utils.export import export_as_png
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Validation des données
 # ─────────────────────────────────────────────────────────────────────────────
-def validate_histogram_data(df):
+# Schéma déclaratif : vérifié en une passe, verdict mis en cache par empreinte du jeu de données
+HISTOGRAM_SCHEMA = {
+    "min_columns": 1,
+    "min_numeric_columns": 1,
+    "min_rows": 5,
+    "messages": {
+        "empty": "Aucune donnée fournie.",
+        "min_columns": "Au moins une colonne numérique est requise.",
+        "min_numeric_columns": "Au moins une colonne doit contenir des valeurs numériques.",
+        "min_rows": "Au moins 5 valeurs sont nécessaires pour un histogramme pertinent.",
+    },
+}
+validate_histogram_schema = compile_schema(HISTOGRAM_SCHEMA)
+
+
+def validate_histogram_data(df, fingerprint=None):
     """
     Valide les données fournies pour l'analyse par histogramme.
 
     Returns
     -------
-    tuple(bool, str) : (valide ?, message d'erreur)
+    tuple(bool, str) : (valide ?, message d'erreur)
     """
-    if df is None or df.empty:
-        return False, "Aucune donnée fournie."
-
-    if len(df.columns) < 1:
-        return False, "Au moins une colonne numérique est requise."
-
-    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-    if not numeric_cols:
-        return False, "Au moins une colonne doit contenir des valeurs numériques."
-
-    if len(df) < 5:
-        return False, "Au moins 5 valeurs sont nécessaires pour un histogramme pertinent."
-
-    return True, ""
+    return validate_histogram_schema(df, fingerprint)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -50,6 +60,13 @@ def generate_histogram(
         st.error("Entrée invalide : vous devez fournir des données numériques non vides.")
         return None
 
+    # Les colonnes importées peuvent contenir des valeurs manquantes
+    data = np.asarray(data, dtype=float)
+    data = data[~np.isnan(data)]
+    if len(data) == 0:
+        st.error("Entrée invalide : la colonne ne contient aucune valeur numérique renseignée.")
+        return None
+
     stats = {
         "Count": len(data),
         "Mean": np.mean(data),
@@ -128,11 +145,12 @@ def histogram_tool():
         st.markdown("### Étape 1 : Choisissez votre source de données")
         input_method = st.radio(
             "Mode d'entrée des données :",
-            ["Données d'exemple", "Saisie manuelle"],
+            ["Données d'exemple", "Saisie manuelle", "Importer un fichier"],
             horizontal=True,
         )
 
         df = None
+        fingerprint = None
 
         if input_method == "Données d'exemple":
             st.markdown("#### Données d'exemple : temps de cycle d'assemblage (sec)")
@@ -140,7 +158,14 @@ def histogram_tool():
                 st.session_state.demo_histogram_data.head(10),
                 use_container_width=True,
             )
-            df = st.session_state.demo_histogram_data.copy()
+            df = st.session_state.demo_histogram_data
+
+        elif input_method == "Importer un fichier":
+            st.markdown("#### Importer un fichier")
+            uploaded = dataset_uploader("histogram_upload")
+            if uploaded is not None:
+                df, fingerprint = uploaded
+                st.dataframe(df.head(10), use_container_width=True)
 
         else:  # Saisie manuelle
             st.markdown("#### Saisie manuelle")
@@ -165,19 +190,21 @@ def histogram_tool():
 
         # Validation & stockage
         if df is not None and not df.empty:
-            valid, error_msg = validate_histogram_data(df)
+            fingerprint = fingerprint or dataset_fingerprint(df)
+            valid, error_msg = validate_histogram_data(df, fingerprint)
             if not valid:
                 st.error(error_msg)
             else:
-                st.session_state.histogram_data = df
+                register_dataset(st.session_state, "histogram", df, fingerprint)
                 st.info("Données prêtes. Passez à l'onglet « Visualisation ».")
 
     # ──────────── Onglet 2 : visualisation ────────────
     with tab2:
-        if "histogram_data" not in st.session_state:
+        # Seule l'empreinte est gardée en session : la vue est résolue à chaque exécution
+        df = dataset_view(st.session_state, "histogram")
+        if df is None:
             st.info("Veuillez d'abord charger des données dans l'onglet « Saisie des données ».")
         else:
-            df = st.session_state.histogram_data
             st.markdown("### Étape 2 : Personnalisez votre histogramme")
 
             numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
@@ -218,7 +245,7 @@ def histogram_tool():
 
             try:
                 fig = generate_histogram(
-                    df[selected_column],
+                    dataset_column(st.session_state, "histogram", selected_column, df),
                     bins=num_bins,
                     chart_title=chart_title,
                     x_label=x_label,
@@ -2,38 +2,69 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter
 import numpy as np
+from bisect import bisect_right
+from scipy.stats import chi2_contingency
+from utils.data import (
+    compile_schema,
+    dataset_fingerprint,
+    dataset_uploader,
+    dataset_view,
+    register_dataset,
+    text_fingerprint,
+)
 from utils.export import export_as_png, export_as_pdf
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Validation des données
 # ─────────────────────────────────────────────────────────────────────────────
-def validate_pareto_data(df):
+# Schéma déclaratif : vérifié en une passe, verdict mis en cache par empreinte du jeu de données
+PARETO_SCHEMA = {
+    "min_columns": 2,
+    "columns": {1: {"dtype": "numeric", "min": 0}},
+    "min_rows": 2,
+    "messages": {
+        "empty": "Aucune donnée fournie.",
+        "min_columns": "Au moins deux colonnes sont requises : l'une pour les catégories et l'autre pour les valeurs.",
+        "dtype": "La deuxième colonne doit contenir des valeurs numériques.",
+        "min_value": "La deuxième colonne ne doit pas contenir de valeurs négatives.",
+        "min_rows": "Au moins deux points de données sont nécessaires pour un diagramme de Pareto pertinent.",
+    },
+}
+validate_pareto_schema = compile_schema(PARETO_SCHEMA)
+
+
+def validate_pareto_data(df, fingerprint=None):
     """
     Valide les données téléchargées pour l'analyse de Pareto.
 
     Args:
         df (pandas.DataFrame): Le DataFrame à valider.
+        fingerprint (str, optional): Empreinte du jeu de données (cache du verdict).
 
     Returns:
         tuple: (is_valid, message_erreur)
     """
-    if df is None or df.empty:
-        return False, "Aucune donnée fournie."
+    return validate_pareto_schema(df, fingerprint)
 
-    if len(df.columns) < 2:
-        return False, "Au moins deux colonnes sont requises : l'une pour les catégories et l'autre pour les valeurs."
-
-    # Vérifie que la deuxième colonne est bien numérique
-    try:
-        pd.to_numeric(df.iloc[:, 1])
-    except Exception:
-        return False, "La deuxième colonne doit contenir des valeurs numériques."
 
-    if len(df) < 2:
-        return False, "Au moins deux points de données sont nécessaires pour un diagramme de Pareto pertinent."
+def validate_pareto_value(value):
+    """
+    Valide une seule valeur saisie (modification d'une cellule).
 
+    Returns:
+        tuple: (is_valid, message_erreur)
+    """
+    if value is None or pd.isna(value):
+        return False, "La valeur ne peut pas être vide."
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return False, "La valeur doit être numérique."
+    if value < 0:
+        return False, "La valeur doit être positive."
     return True, ""
 
 
@@ -57,11 +88,11 @@ def create_pareto_chart(
     Returns:
         matplotlib.figure.Figure, pandas.DataFrame (données triées)
     """
-    # Force la colonne de valeurs en numérique
-    df[value_col] = pd.to_numeric(df[value_col], errors="coerce")
+    # Force la colonne de valeurs en numérique (sans modifier le DataFrame fourni, partagé en session)
+    values = pd.to_numeric(df[value_col], errors="coerce")
 
     # Trie décroissant
-    df_sorted = df.sort_values(by=value_col, ascending=False).copy()
+    df_sorted = df.assign(**{value_col: values}).sort_values(by=value_col, ascending=False, kind="stable")
 
     # Pourcentages cumulés
     df_sorted["cumulative"] = df_sorted[value_col].cumsum()
@@ -135,6 +166,455 @@ def create_pareto_chart(
     return fig, df_sorted
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Index trié et mise à jour incrémentale
+# ─────────────────────────────────────────────────────────────────────────────
+def build_pareto_index(values):
+    """
+    Construit l'index trié (ordre décroissant) et les cumuls d'un Pareto.
+
+    Args:
+        values (array-like): Valeurs dans l'ordre des lignes saisies.
+
+    Returns:
+        dict: rows (ligne d'origine de chaque position), values (triées),
+        cumulative (cumuls), position (position de chaque ligne), total
+    """
+    values = np.asarray(values, dtype=float)
+    # Même ordre que `create_pareto_chart` : tri stable décroissant, valeurs manquantes en fin
+    rows = np.argsort(np.where(np.isnan(values), np.inf, -values), kind="stable")
+    values = np.nan_to_num(values)
+    position = np.empty_like(rows)
+    position[rows] = np.arange(len(rows))
+    sorted_values = values[rows]
+    cumulative = np.cumsum(sorted_values)
+    return {
+        "rows": rows,
+        "values": sorted_values,
+        "cumulative": cumulative,
+        "position": position,
+        "total": float(cumulative[-1]) if len(cumulative) else 0.0,
+    }
+
+
+def update_pareto_index(index, row, new_value):
+    """
+    Applique la modification d'une seule valeur à l'index trié.
+
+    La nouvelle position est trouvée par dichotomie (O(log n)) ; seules les
+    positions entre l'ancienne et la nouvelle sont décalées et leurs cumuls
+    recalculés, la suite des cumuls étant simplement translatée de l'écart.
+
+    Returns:
+        tuple: (première, dernière) position dont la barre a changé
+    """
+    values, rows, cumulative = index["values"], index["rows"], index["cumulative"]
+    i = int(index["position"][row])
+    old_value = values[i]
+    new_value = 0.0 if pd.isna(new_value) else float(new_value)
+    delta = new_value - old_value
+
+    # Rang parmi les autres catégories : après celles de valeur supérieure ou égale
+    j = bisect_right(values, -new_value, key=lambda v: -v) - (1 if old_value >= new_value else 0)
+
+    if j < i:
+        values[j + 1 : i + 1] = values[j:i].copy()
+        rows[j + 1 : i + 1] = rows[j:i].copy()
+    elif j > i:
+        values[i:j] = values[i + 1 : j + 1].copy()
+        rows[i:j] = rows[i + 1 : j + 1].copy()
+    values[j] = new_value
+    rows[j] = row
+
+    lo, hi = min(i, j), max(i, j)
+    index["position"][rows[lo : hi + 1]] = np.arange(lo, hi + 1)
+    start = cumulative[lo - 1] if lo > 0 else 0.0
+    cumulative[lo : hi + 1] = start + np.cumsum(values[lo : hi + 1])
+    cumulative[hi + 1 :] += delta
+    index["total"] += delta
+    return lo, hi
+
+
+def pareto_index_frame(index, df, category_col, value_col):
+    """Reconstitue le tableau trié (même format que `create_pareto_chart`) depuis l'index."""
+    total = index["total"] or np.nan
+    return pd.DataFrame(
+        {
+            category_col: df[category_col].to_numpy()[index["rows"]],
+            value_col: index["values"],
+            "cumulative": index["cumulative"],
+            "percentage": 100 * index["values"] / total,
+            "cumulative_percentage": 100 * index["cumulative"] / total,
+        },
+        index=df.index[index["rows"]],
+    )
+
+
+def update_pareto_chart(fig, index, categories, lo, hi):
+    """
+    Met à jour sur place un diagramme produit par `create_pareto_chart`.
+
+    Seules les barres (et leurs étiquettes) des positions `lo` à `hi` sont
+    modifiées ; la courbe cumulée est mise à jour d'un bloc et les libellés
+    de l'axe X sont lus dans l'index au moment du rendu.
+    """
+    ax1 = fig.axes[0]
+    ax2 = fig.axes[1]
+    bars, value_texts = ax1.patches, ax1.texts
+
+    for pos in range(lo, hi + 1):
+        height = index["values"][pos]
+        bars[pos].set_height(height)
+        value_texts[pos].set_y(height + 0.1)
+        value_texts[pos].set_text(f"{height:.0f}")
+
+    labels = np.asarray(categories)
+    ax1.xaxis.set_major_formatter(
+        FuncFormatter(lambda x, _pos: str(labels[index["rows"][int(round(x))]]) if 0 <= round(x) < len(labels) else "")
+    )
+    ax1.relim()
+    ax1.autoscale_view()
+
+    cumulative_pct = 100 * index["cumulative"] / (index["total"] or np.nan)
+    ax2.lines[0].set_ydata(cumulative_pct)
+    for pos, annotation in enumerate(ax2.texts):
+        annotation.xy = (pos, cumulative_pct[pos])
+        annotation.set_text(f"{cumulative_pct[pos]:.1f} %")
+
+
+def diff_editor_edits(previous, current):
+    """
+    Compare deux états `edited_rows` d'un `st.data_editor`.
+
+    Returns:
+        list: cellules modifiées depuis l'état précédent, sous la forme
+        (ligne, colonne, valeur) ; une valeur `None` signale une cellule vidée
+        ou une saisie annulée.
+    """
+    changes = []
+    for row in set(previous) | set(current):
+        before, after = previous.get(row, {}), current.get(row, {})
+        for col in set(before) | set(after):
+            if col not in after:
+                changes.append((row, col, None))
+            elif col not in before or before[col] != after[col]:
+                changes.append((row, col, after[col]))
+    return changes
+
+
+def edited_fingerprint(fingerprint, changes):
+    """Empreinte des données après des modifications de cellules, dérivée de l'empreinte précédente (O(1))."""
+    return text_fingerprint(f"{fingerprint}|{sorted(changes, key=repr)!r}")
+
+
+def commit_pareto_edits():
+    """
+    Enregistre dans le magasin partagé les données modifiées cellule par
+    cellule depuis le dernier enregistrement.
+
+    Les modifications isolées ne convertissent pas tout le tableau : il est
+    enregistré une seule fois, lorsque l'analyse le demande ou à la
+    prochaine validation complète.
+    """
+    pending = st.session_state.get("pareto_unregistered")
+    if pending is not None:
+        df, fingerprint = pending
+        register_dataset(st.session_state, "pareto", df, fingerprint)
+        st.session_state.pareto_unregistered = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stabilité des causes vitales (bootstrap)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_data(show_spinner=False)
+def bootstrap_vital_few(counts, n_boot=5000, threshold=80.0, confidence=0.95, seed=42, max_cells=5_000_000):
+    """
+    Rééchantillonne les effectifs par tirages multinomiaux pour mesurer la
+    stabilité des causes vitales.
+
+    Les `n_boot` tirages sont générés par lots de `max_cells` cellules au plus
+    (un seul appel `multinomial` vectorisé par lot) ; chaque tirage est trié,
+    cumulé puis soumis à la même règle que le diagramme (cumul ≤ seuil, au
+    moins la première catégorie). Pour la bande de confiance, seules les
+    queues basse et haute des cumuls sont conservées d'un lot à l'autre :
+    la mémoire ne croît pas avec `n_boot` × catégories.
+
+    Args:
+        counts (array-like): Effectifs dans l'ordre du Pareto observé.
+        n_boot (int): Nombre de rééchantillonnages.
+        threshold (float): Seuil de cumul (%) définissant les causes vitales.
+        confidence (float): Niveau de la bande de confiance.
+        seed (int): Graine du générateur aléatoire.
+
+    Returns:
+        dict: fréquence d'appartenance aux causes vitales par catégorie, bornes
+        basse / haute du pourcentage cumulé (ordre observé) et nombre de tirages.
+
+    Raises:
+        ValueError: Effectifs arrondis négatifs ou de somme nulle.
+    """
+    counts = np.rint(np.asarray(counts, dtype=float)).astype(np.int64)
+    total = int(counts.sum())
+    if total <= 0 or (counts < 0).any():
+        raise ValueError("les effectifs arrondis doivent être positifs et de somme non nulle")
+    k = len(counts)
+    probabilities = counts / total
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    membership = np.zeros(k, dtype=np.int64)
+    # Rang (interpolé) du quantile alpha, et nombre de plus petites valeurs à garder pour le calculer
+    rank = alpha * (n_boot - 1)
+    tail = min(n_boot, int(np.floor(rank)) + 2)
+    low_tail = np.empty((0, k), dtype=np.float32)
+    high_tail = np.empty((0, k), dtype=np.float32)  # opposés : la queue haute devient une queue basse
+
+    batch = max(1, min(n_boot, max_cells // max(k, 1)))
+    for start in range(0, n_boot, batch):
+        draws = rng.multinomial(total, probabilities, size=min(batch, n_boot - start))
+
+        # Règle des causes vitales appliquée à chaque tirage, trié décroissant
+        order = np.argsort(-draws, axis=1, kind="stable")
+        sorted_pct = 100 * np.cumsum(np.take_along_axis(draws, order, axis=1), axis=1) / total
+        vital_sorted = sorted_pct <= threshold
+        vital_sorted[:, 0] = True
+        vital = np.zeros_like(vital_sorted)
+        np.put_along_axis(vital, order, vital_sorted, axis=1)
+        membership += vital.sum(axis=0)
+
+        # Courbe cumulée dans l'ordre observé, pour la bande de confiance
+        cumulative = (100 * np.cumsum(draws, axis=1) / total).astype(np.float32)
+        low_tail = _smallest_rows(np.vstack([low_tail, cumulative]), tail)
+        high_tail = _smallest_rows(np.vstack([high_tail, -cumulative]), tail)
+
+    return {
+        "frequency": membership / n_boot,
+        "cumulative_low": _tail_quantile(low_tail, rank),
+        "cumulative_high": -_tail_quantile(high_tail, rank),
+        "n_boot": n_boot,
+    }
+
+
+def _smallest_rows(values, count):
+    """Garde, colonne par colonne, les `count` plus petites valeurs (non triées)."""
+    if len(values) <= count:
+        return values
+    return np.partition(values, count - 1, axis=0)[:count]
+
+
+def _tail_quantile(tail, rank):
+    """Quantile par interpolation linéaire au rang `rank`, à partir des plus petites valeurs de chaque colonne."""
+    ordered = np.sort(tail, axis=0).astype(float)
+    below = int(np.floor(rank))
+    above = min(below + 1, len(ordered) - 1)
+    return ordered[below] + (rank - below) * (ordered[above] - ordered[below])
+
+
+def create_vital_few_stability_chart(
+    categories,
+    cumulative_percentage,
+    stability,
+    threshold=80.0,
+    bar_color="#1f77b4",
+    line_color="#ff7f0e",
+    max_categories=30,
+):
+    """
+    Fréquence d'appartenance aux causes vitales (barres) et pourcentage cumulé
+    observé avec sa bande de confiance bootstrap (courbe).
+
+    Returns:
+        matplotlib.figure.Figure
+    """
+    shown = min(len(categories), max_categories)
+    labels = [str(c) for c in categories[:shown]]
+    x = np.arange(shown)
+    frequency = 100 * stability["frequency"][:shown]
+
+    fig, ax1 = plt.subplots(figsize=(12, 7))
+    ax1.set_facecolor("#f8f8f8")
+    colors = [bar_color if f >= 50 else "#c7c7c7" for f in frequency]
+    bars = ax1.bar(x, frequency, color=colors, edgecolor="black", alpha=0.8, width=0.6)
+    for bar, f in zip(bars, frequency):
+        ax1.text(bar.get_x() + bar.get_width() / 2.0, f + 1, f"{f:.0f} %", ha="center", va="bottom", fontsize=9)
+    ax1.set_ylim(0, 110)
+    ax1.set_ylabel("Fréquence « cause vitale » (%)", fontsize=12, fontweight="bold", color=bar_color)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(labels, rotation=45 if shown > 5 else 0, ha="right" if shown > 5 else "center")
+
+    ax2 = ax1.twinx()
+    ax2.fill_between(
+        x,
+        stability["cumulative_low"][:shown],
+        stability["cumulative_high"][:shown],
+        color=line_color,
+        alpha=0.2,
+        label="Bande de confiance",
+    )
+    ax2.plot(x, np.asarray(cumulative_percentage)[:shown], color=line_color, marker="o", linewidth=2.5, label="Cumul observé")
+    ax2.axhline(y=threshold, color="red", linestyle="--", alpha=0.7, linewidth=1.5, label=f"Seuil {threshold:.0f} %")
+    ax2.set_ylim(0, 110)
+    ax2.set_ylabel("Pourcentage cumulé", fontsize=12, fontweight="bold", color=line_color)
+    ax2.legend(loc="center right")
+
+    ax1.grid(axis="y", linestyle="--", alpha=0.3)
+    ax1.set_title(
+        f"Stabilité des causes vitales ({stability['n_boot']} rééchantillonnages)", fontsize=16, fontweight="bold", pad=15
+    )
+    plt.tight_layout()
+    return fig
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Comparaison avant / après
+# ─────────────────────────────────────────────────────────────────────────────
+def split_by_period(df, period_col, before_label, after_label):
+    """
+    Découpe un jeu de données en deux périodes selon la colonne `period_col`.
+
+    Returns:
+        tuple: (df_avant, df_apres)
+    """
+    periods = df[period_col].astype(str)
+    return df[periods == str(before_label)], df[periods == str(after_label)]
+
+
+def align_pareto_periods(df_before, df_after, category_col, value_col):
+    """
+    Aligne les catégories de deux périodes par jointure externe vectorisée.
+
+    Les valeurs sont agrégées par catégorie (plusieurs lignes par catégorie
+    sont acceptées) puis jointes sur l'union des catégories ; une catégorie
+    absente d'une période compte pour 0.
+
+    Returns:
+        pandas.DataFrame: index = catégories, colonnes « Avant », « Après »,
+        « Écart », « % Avant », « % Après », « Écart (pts) », trié selon le
+        Pareto de la période « avant ».
+    """
+    before = pd.to_numeric(df_before[value_col], errors="coerce").groupby(df_before[category_col], sort=False).sum()
+    after = pd.to_numeric(df_after[value_col], errors="coerce").groupby(df_after[category_col], sort=False).sum()
+
+    aligned = pd.concat({"Avant": before, "Après": after}, axis=1, join="outer").fillna(0)
+    aligned.index.name = category_col
+
+    totals = aligned[["Avant", "Après"]].sum()
+    aligned["Écart"] = aligned["Après"] - aligned["Avant"]
+    aligned["% Avant"] = 100 * aligned["Avant"] / totals["Avant"] if totals["Avant"] else 0.0
+    aligned["% Après"] = 100 * aligned["Après"] / totals["Après"] if totals["Après"] else 0.0
+    aligned["Écart (pts)"] = aligned["% Après"] - aligned["% Avant"]
+
+    return aligned.sort_values(["Avant", "Après"], ascending=False, kind="stable")
+
+
+def pareto_shift_test(aligned):
+    """
+    Test du khi‑deux d'homogénéité sur la table de contingence catégories × périodes.
+
+    Les catégories nulles sur les deux périodes sont ignorées. Les résidus
+    standardisés ajustés (période « après ») indiquent les catégories qui ont
+    significativement bougé (|résidu| > 1,96 au seuil de 5 %).
+
+    Returns:
+        dict: chi2, ddl, p_value, part des effectifs théoriques < 5, résidus (Series)
+    """
+    table = aligned[["Avant", "Après"]]
+    table = table[(table["Avant"] > 0) | (table["Après"] > 0)]
+    if len(table) < 2 or (table.sum() == 0).any():
+        return None
+
+    observed = table.to_numpy(dtype=float).T  # 2 × k
+    chi2, p_value, dof, expected = chi2_contingency(observed, correction=False)
+
+    total = observed.sum()
+    row_share = observed.sum(axis=1, keepdims=True) / total
+    col_share = observed.sum(axis=0, keepdims=True) / total
+    residuals = (observed - expected) / np.sqrt(expected * (1 - row_share) * (1 - col_share))
+
+    return {
+        "chi2": float(chi2),
+        "ddl": int(dof),
+        "p_value": float(p_value),
+        "low_expected_share": float((expected < 5).mean()),
+        "residuals": pd.Series(residuals[1], index=table.index, name="Résidu ajusté"),
+    }
+
+
+def create_pareto_comparison_chart(
+    aligned,
+    mode="Côte à côte",
+    chart_title="Comparaison avant / après",
+    max_categories=20,
+    before_color="#1f77b4",
+    after_color="#2ca02c",
+    line_color="#ff7f0e",
+):
+    """
+    Diagramme de comparaison de deux périodes : Pareto côte à côte ou écarts.
+
+    Seules les `max_categories` premières catégories sont tracées (selon le
+    Pareto de chaque période, ou selon l'écart absolu en mode « Écarts ») ;
+    les pourcentages cumulés restent calculés sur la totalité des catégories.
+
+    Returns:
+        matplotlib.figure.Figure
+    """
+    if mode == "Écarts":
+        fig, ax = plt.subplots(figsize=(12, 8))
+        ax.set_facecolor("#f8f8f8")
+        # Plus forts écarts absolus, affichés dans l'ordre du Pareto « avant »
+        largest = aligned["Écart"].abs().nlargest(max_categories).index
+        top = aligned[aligned.index.isin(largest)]
+        colors = np.where(top["Écart"].to_numpy() <= 0, "#2ca02c", "#d62728")
+        labels = top.index.astype(str)
+        bars = ax.bar(labels, top["Écart"], color=colors, edgecolor="black", alpha=0.8, width=0.6)
+        for bar, delta in zip(bars, top["Écart"]):
+            ax.annotate(
+                f"{delta:+.0f}",
+                (bar.get_x() + bar.get_width() / 2.0, delta),
+                textcoords="offset points",
+                xytext=(0, 4 if delta >= 0 else -12),
+                ha="center",
+                fontsize=9,
+            )
+        ax.axhline(0, color="black", linewidth=1)
+        ax.set_ylabel("Écart (après − avant)", fontsize=12, fontweight="bold")
+        ax.grid(axis="y", linestyle="--", alpha=0.3)
+        if len(top) > 5:
+            plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+        ax.set_title(chart_title, fontsize=16, fontweight="bold", pad=15)
+        plt.tight_layout()
+        return fig
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 7), sharey=True)
+    for ax, period, color in zip(axes, ["Avant", "Après"], [before_color, after_color]):
+        ax.set_facecolor("#f8f8f8")
+        values = aligned[period].sort_values(ascending=False, kind="stable")
+        total = values.sum()
+        cumulative = 100 * values.cumsum() / total if total else values * 0
+        shown = values.iloc[:max_categories]
+        labels = shown.index.astype(str)
+
+        ax.bar(labels, shown, color=color, edgecolor="black", alpha=0.8, width=0.6)
+        ax.set_title(f"{period} (total : {total:.0f})", fontsize=13, fontweight="bold")
+        ax.grid(axis="y", linestyle="--", alpha=0.3)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right", fontsize=9)
+
+        ax_pct = ax.twinx()
+        ax_pct.plot(labels, cumulative.iloc[:max_categories], color=line_color, marker="o", linewidth=2)
+        ax_pct.axhline(y=80, color="red", linestyle="--", alpha=0.7, linewidth=1.2)
+        ax_pct.set_ylim(0, 110)
+        if period == "Après":
+            ax_pct.set_ylabel("Pourcentage cumulé", fontsize=11, color=line_color)
+        else:
+            ax_pct.set_yticklabels([])
+
+    axes[0].set_ylabel("Fréquence", fontsize=12, fontweight="bold")
+    fig.suptitle(chart_title, fontsize=16, fontweight="bold")
+    plt.tight_layout()
+    return fig
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Outil Streamlit
 # ─────────────────────────────────────────────────────────────────────────────
@@ -174,7 +654,22 @@ def pareto_tool():
             }
         )
 
-    tab1, tab2 = st.tabs(["Saisie des données", "Visualisation"])
+        # Même périmètre après action corrective, sous forme découpée par période
+        after = pd.DataFrame(
+            {
+                "Type de réclamation": st.session_state.demo_pareto_data["Type de réclamation"],
+                "Fréquence": [64, 118, 31, 40, 33, 30, 17],
+            }
+        )
+        st.session_state.demo_pareto_periods = pd.concat(
+            [
+                st.session_state.demo_pareto_data.assign(Période="T1"),
+                after.assign(Période="T2"),
+            ],
+            ignore_index=True,
+        )
+
+    tab1, tab2, tab3 = st.tabs(["Saisie des données", "Visualisation", "Comparaison avant / après"])
 
     # ────────────────
     # Onglet 1 : Données
@@ -184,18 +679,27 @@ def pareto_tool():
 
         input_method = st.radio(
             "Sélectionnez le mode d'entrée des données :",
-            ["Données d'exemple", "Saisie manuelle"],
+            ["Données d'exemple", "Saisie manuelle", "Importer un fichier"],
             horizontal=True,
-            help="Choisissez entre le jeu de données préchargé ou entrez vos propres données.",
+            help="Choisissez entre le jeu de données préchargé, vos propres données ou un export (CSV, Parquet, Excel).",
         )
 
         df = None
+        fingerprint = None
 
         if input_method == "Données d'exemple":
             st.markdown("#### Données d'exemple : Réclamations clients")
             st.markdown("Ce jeu de données montre la répartition des réclamations clients par type.")
             st.dataframe(st.session_state.demo_pareto_data, use_container_width=True)
-            df = st.session_state.demo_pareto_data.copy()
+            df = st.session_state.demo_pareto_data
+
+        elif input_method == "Importer un fichier":
+            st.markdown("#### Importer un fichier")
+            st.markdown("La première colonne sélectionnée contient les catégories, la deuxième les valeurs.")
+            uploaded = dataset_uploader("pareto_upload")
+            if uploaded is not None:
+                df, fingerprint = uploaded
+                st.dataframe(df.head(100), use_container_width=True)
 
         else:  # Saisie manuelle
             st.markdown("#### Saisie manuelle")
@@ -227,6 +731,7 @@ def pareto_tool():
             st.markdown("#### Vos données :")
             data_editor = st.data_editor(
                 st.session_state.manual_pareto_data,
+                key="manual_pareto_editor",
                 use_container_width=True,
                 hide_index=True,
                 num_rows="fixed",
@@ -243,23 +748,66 @@ def pareto_tool():
             if data_editor is not None:
                 df = data_editor
 
-        # Validation
+        # Validation : complète au chargement, limitée à la cellule modifiée ensuite
+        st.session_state.setdefault("pareto_data_version", 0)
+        st.session_state.setdefault("pareto_pending_edits", [])
         if df is not None and not df.empty:
-            valid, error_msg = validate_pareto_data(df)
+            if input_method == "Saisie manuelle":
+                base = st.session_state.manual_pareto_data
+                edits = {
+                    row: dict(cells)
+                    for row, cells in st.session_state.get("manual_pareto_editor", {}).get("edited_rows", {}).items()
+                }
+            elif input_method == "Importer un fichier":
+                base, edits = df, {}
+            else:
+                base, edits = st.session_state.demo_pareto_data, {}
+            signature = (input_method, id(base), len(base))
+
+            previous = st.session_state.get("pareto_input_state")
+            changes = None
+            if previous is not None and previous["signature"] == signature and previous["valid"]:
+                changes = diff_editor_edits(previous["edits"], edits)
+
+            # Une cellule modifiée : empreinte dérivée et enregistrement différé, sans parcourir le tableau
+            if changes == []:
+                valid, error_msg = True, ""
+                fingerprint = previous["fingerprint"]
+            elif changes is not None and len(changes) == 1 and validate_pareto_value(changes[0][2])[0]:
+                valid, error_msg = True, ""
+                fingerprint = edited_fingerprint(previous["fingerprint"], changes)
+                st.session_state.pareto_pending_edits.append(changes[0])
+                st.session_state.pareto_unregistered = (df, fingerprint)
+            else:
+                fingerprint = fingerprint or dataset_fingerprint(df)
+                valid, error_msg = validate_pareto_data(df, fingerprint)
+                st.session_state.pareto_data_version += 1
+                st.session_state.pareto_pending_edits = []
+                if valid:
+                    st.session_state.pareto_unregistered = None
+                    register_dataset(st.session_state, "pareto", df, fingerprint)
+            st.session_state.pareto_input_state = {
+                "signature": signature,
+                "edits": edits,
+                "valid": valid,
+                "fingerprint": fingerprint,
+            }
+
             if not valid:
                 st.error(error_msg)
             else:
-                st.session_state.pareto_data = df
                 st.success("Données chargées avec succès. Rendez‑vous dans l'onglet « Visualisation ».")
 
     # ────────────────
     # Onglet 2 : Visualisation
     # ────────────────
     with tab2:
-        if "pareto_data" not in st.session_state:
+        # Données modifiées pas encore enregistrées, sinon vue résolue depuis l'empreinte à chaque exécution
+        pending = st.session_state.get("pareto_unregistered")
+        df = pending[0] if pending is not None else dataset_view(st.session_state, "pareto")
+        if df is None:
             st.info("Veuillez d'abord charger vos données dans l'onglet « Saisie des données ».")
         else:
-            df = st.session_state.pareto_data
             st.markdown("### Étape 2 : Personnalisez votre diagramme")
 
             with st.container():
@@ -291,15 +839,40 @@ def pareto_tool():
             st.markdown("### Votre diagramme de Pareto")
 
             try:
-                fig, df_sorted = create_pareto_chart(
-                    df,
-                    category_column,
-                    value_column,
-                    chart_title=chart_title,
-                    x_label=x_label,
-                    y_label=y_label,
-                    show_percent_line=show_reference,
-                )
+                # Réutilise le diagramme en cache et n'applique que les cellules modifiées
+                chart_params = (category_column, value_column, chart_title, x_label, y_label, show_reference)
+                cache = st.session_state.get("pareto_chart_cache")
+                pending = st.session_state.pareto_pending_edits
+                if (
+                    cache is not None
+                    and cache["version"] == st.session_state.pareto_data_version
+                    and cache["params"] == chart_params
+                    and all(col == value_column for _, col, _ in pending)
+                ):
+                    for row, _, value in pending:
+                        lo, hi = update_pareto_index(cache["index"], row, value)
+                        update_pareto_chart(cache["fig"], cache["index"], df[category_column].to_numpy(), lo, hi)
+                    fig = cache["fig"]
+                    df_sorted = pareto_index_frame(cache["index"], df, category_column, value_column)
+                else:
+                    if cache is not None:
+                        plt.close(cache["fig"])
+                    fig, df_sorted = create_pareto_chart(
+                        df,
+                        category_column,
+                        value_column,
+                        chart_title=chart_title,
+                        x_label=x_label,
+                        y_label=y_label,
+                        show_percent_line=show_reference,
+                    )
+                    st.session_state.pareto_chart_cache = {
+                        "fig": fig,
+                        "index": build_pareto_index(df[value_column]),
+                        "params": chart_params,
+                        "version": st.session_state.pareto_data_version,
+                    }
+                st.session_state.pareto_pending_edits = []
                 st.pyplot(fig)
 
                 # ───────── Résultats analyse Pareto ─────────
@@ -335,6 +908,54 @@ def pareto_tool():
                         f"{vital_few['cumulative_percentage'].max():.1f} % des problèmes."
                     )
 
+                # ───────── Stabilité (bootstrap) ─────────
+                with st.expander("Stabilité des causes vitales (bootstrap)", expanded=False):
+                    st.markdown(
+                        "Avec de petits effectifs, le classement des catégories est bruité. "
+                        "Le rééchantillonnage des événements indique la fréquence à laquelle chaque catégorie "
+                        "figure parmi les causes vitales."
+                    )
+                    counts = df_sorted[value_column].fillna(0).to_numpy()
+                    # Même arrondi que le rééchantillonnage : des valeurs fractionnaires peuvent s'annuler
+                    rounded = np.rint(counts)
+                    if rounded.sum() <= 0 or (rounded < 0).any():
+                        st.info(
+                            "Les valeurs, arrondies à l'entier, doivent être des effectifs positifs "
+                            "de somme non nulle pour le rééchantillonnage."
+                        )
+                    elif st.checkbox("Lancer l'analyse de stabilité", key="pareto_bootstrap"):
+                        n_boot = st.select_slider(
+                            "Nombre de rééchantillonnages :", [1000, 2000, 5000, 10000, 20000], value=5000
+                        )
+                        if not np.allclose(counts, np.rint(counts)):
+                            st.caption("Les valeurs non entières sont arrondies : le rééchantillonnage suppose des effectifs.")
+                        commit_pareto_edits()
+                        with st.spinner("Rééchantillonnage en cours…"):
+                            stability = bootstrap_vital_few(tuple(counts.tolist()), n_boot=n_boot)
+                        st.pyplot(
+                            create_vital_few_stability_chart(
+                                df_sorted[category_column].tolist(),
+                                df_sorted["cumulative_percentage"].to_numpy(),
+                                stability,
+                            )
+                        )
+                        stability_table = pd.DataFrame(
+                            {
+                                category_column: df_sorted[category_column].to_numpy(),
+                                "Cause vitale (%)": (100 * stability["frequency"]).round(1),
+                                "Cumul % (bas)": stability["cumulative_low"].round(1),
+                                "Cumul % (haut)": stability["cumulative_high"].round(1),
+                            }
+                        )
+                        st.dataframe(stability_table, use_container_width=True, hide_index=True)
+                        uncertain = stability_table[stability_table["Cause vitale (%)"].between(20, 80)]
+                        if not uncertain.empty:
+                            st.warning(
+                                "Classement incertain pour : "
+                                + ", ".join(uncertain[category_column].astype(str))
+                                + ". Collectez davantage de données avant de conclure."
+                            )
+
                 # Jeu de données complet
                 with st.expander("Afficher le jeu de données complet", expanded=False):
                     full = df_sorted[[category_column, value_column, "percentage", "cumulative_percentage"]].copy()
@@ -379,3 +1000,150 @@ def pareto_tool():
                 3. **Mesurez de nouveau** après amélioration pour vérifier l'impact
                 """
                 )
+
+    # ────────────────
+    # Onglet 3 : Comparaison avant / après
+    # ────────────────
+    with tab3:
+        st.markdown("### Comparer deux périodes ou deux sites")
+        st.markdown(
+            "Vérifiez l'efficacité d'une action corrective en comparant la répartition des causes "
+            "avant et après, ou entre deux usines."
+        )
+
+        compare_method = st.radio(
+            "Source de la comparaison :",
+            ["Données d'exemple (découpage par période)", "Deux jeux de données"],
+            horizontal=True,
+            key="pareto_compare_method",
+        )
+
+        df_before = df_after = None
+        category_column = value_column = None
+
+        if compare_method == "Données d'exemple (découpage par période)":
+            periods_df = st.session_state.demo_pareto_periods
+            with st.expander("Voir les données", expanded=False):
+                st.dataframe(periods_df, use_container_width=True)
+
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                period_column = st.selectbox(
+                    "Colonne période :", periods_df.columns.tolist(), index=2, key="pareto_compare_period"
+                )
+            labels = periods_df[period_column].astype(str).unique().tolist()
+            with c2:
+                before_label = st.selectbox("Période « avant » :", labels, index=0, key="pareto_compare_before_label")
+            with c3:
+                after_label = st.selectbox(
+                    "Période « après » :", labels, index=min(1, len(labels) - 1), key="pareto_compare_after_label"
+                )
+
+            category_column, value_column = periods_df.columns[0], periods_df.columns[1]
+            df_before, df_after = split_by_period(periods_df, period_column, before_label, after_label)
+
+        else:
+            st.caption("Saisissez les mêmes catégories pour les deux périodes ; une catégorie absente compte pour 0.")
+            for key, values in [("pareto_compare_before", [40, 25, 10]), ("pareto_compare_after", [15, 22, 12])]:
+                if key not in st.session_state:
+                    st.session_state[key] = pd.DataFrame(
+                        {"Catégorie": ["Exemple A", "Exemple B", "Exemple C"], "Valeur": values}
+                    )
+
+            c1, c2 = st.columns(2)
+            with c1:
+                st.markdown("#### Avant")
+                df_before = st.data_editor(
+                    st.session_state.pareto_compare_before, key="pareto_compare_before_editor",
+                    hide_index=True, num_rows="dynamic", use_container_width=True,
+                )
+            with c2:
+                st.markdown("#### Après")
+                df_after = st.data_editor(
+                    st.session_state.pareto_compare_after, key="pareto_compare_after_editor",
+                    hide_index=True, num_rows="dynamic", use_container_width=True,
+                )
+            category_column, value_column = "Catégorie", "Valeur"
+
+        valid_before, msg_before = validate_pareto_data(df_before, dataset_fingerprint(df_before))
+        valid_after, msg_after = validate_pareto_data(df_after, dataset_fingerprint(df_after))
+        if not valid_before:
+            st.error(f"Période « avant » : {msg_before}")
+        elif not valid_after:
+            st.error(f"Période « après » : {msg_after}")
+        else:
+            aligned = align_pareto_periods(df_before, df_after, category_column, value_column)
+
+            c1, c2 = st.columns(2)
+            with c1:
+                compare_mode = st.radio(
+                    "Type de graphique :", ["Côte à côte", "Écarts"], horizontal=True, key="pareto_compare_mode"
+                )
+            with c2:
+                max_categories = st.slider(
+                    "Catégories affichées :", 5, 50, min(20, max(5, len(aligned))), key="pareto_compare_max_categories"
+                )
+
+            try:
+                fig_cmp = create_pareto_comparison_chart(aligned, mode=compare_mode, max_categories=max_categories)
+                st.pyplot(fig_cmp)
+            except Exception as e:
+                st.error(f"Erreur lors de la génération du diagramme : {e}")
+                fig_cmp = None
+
+            test = pareto_shift_test(aligned)
+            with st.expander("Significativité du changement (test du khi‑deux)", expanded=True):
+                if test is None:
+                    st.info("Au moins deux catégories non nulles sur chaque période sont nécessaires pour le test.")
+                else:
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("Khi‑deux", f"{test['chi2']:.2f}")
+                    m2.metric("Degrés de liberté", f"{test['ddl']}")
+                    m3.metric("p‑valeur", f"{test['p_value']:.4f}")
+
+                    if test["p_value"] < 0.05:
+                        st.success(
+                            "La répartition des causes a changé de manière significative (p < 0,05)."
+                        )
+                    else:
+                        st.info("Pas de changement significatif de la répartition des causes (p ≥ 0,05).")
+                    if test["low_expected_share"] > 0.2:
+                        st.warning(
+                            f"{test['low_expected_share']*100:.0f} % des effectifs théoriques sont inférieurs à 5 : "
+                            "regroupez les petites catégories pour fiabiliser le test."
+                        )
+
+                    shifted = test["residuals"][test["residuals"].abs() > 1.96]
+                    if not shifted.empty:
+                        st.markdown(
+                            "**Catégories ayant significativement bougé** : "
+                            + ", ".join(
+                                f"{cat} ({'hausse' if res > 0 else 'baisse'})" for cat, res in shifted.items()
+                            )
+                        )
+
+            with st.expander("Tableau comparatif", expanded=False):
+                display = aligned.copy()
+                if test is not None:
+                    display = display.join(test["residuals"])
+                st.dataframe(display.round(2), use_container_width=True)
+
+            if fig_cmp is not None:
+                st.markdown("### Exporter")
+                c1, c2 = st.columns(2)
+                with c1:
+                    try:
+                        png_data = export_as_png(fig_cmp)
+                        st.download_button(
+                            "Exporter en PNG", png_data, "comparaison_pareto.png", "image/png", key="cmp_png"
+                        )
+                    except Exception as e:
+                        st.error(f"Erreur export PNG : {e}")
+                with c2:
+                    try:
+                        pdf_data = export_as_pdf(fig_cmp, "Comparaison avant / après")
+                        st.download_button(
+                            "Exporter en PDF", pdf_data, "comparaison_pareto.pdf", "application/pdf", key="cmp_pdf"
+                        )
+                    except Exception as e:
+                        st.error(f"Erreur export PDF : {e}")
@@ -1,5 +1,115 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from io import StringIO
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import streamlit as st
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+
+SCHEMA_MESSAGES = {
+    "empty": "CSV file is empty.",
+    "min_columns": "At least {count} columns are required.",
+    "required_columns": "Missing required columns: {columns}",
+    "dtype": "Column '{column}' must contain numeric values.",
+    "min_value": "Column '{column}' must not contain values below {limit}.",
+    "max_value": "Column '{column}' must not contain values above {limit}.",
+    "min_numeric_columns": "At least {count} numeric columns are required.",
+    "min_rows": "At least {count} rows are required.",
+}
+
+def compile_schema(schema, cache_size=64):
+    """
+    Compile a declarative table schema into a single-pass validator
+    
+    Supported schema keys (all optional):
+        min_columns (int), required_columns (list), min_numeric_columns (int),
+        min_rows (int), columns (dict: column name or position -> rule with
+        "dtype" ("numeric"), "min" and/or "max"), messages (dict overriding
+        `SCHEMA_MESSAGES`, formatted with count/columns/column/limit).
+    
+    Checks run in the order above, column rules included, each column being
+    scanned at most once. Verdicts are cached by dataset fingerprint, so a
+    dataset already seen is not scanned again.
+    
+    Args:
+        schema (dict): The declarative schema
+        cache_size (int): Number of verdicts kept
+        
+    Returns:
+        callable: validator(df, fingerprint=None) -> (is_valid, error_message)
+    """
+    messages = {**SCHEMA_MESSAGES, **schema.get("messages", {})}
+    min_columns = schema.get("min_columns", 0)
+    required_columns = list(schema.get("required_columns", []))
+    column_rules = dict(schema.get("columns", {}))
+    min_numeric_columns = schema.get("min_numeric_columns", 0)
+    min_rows = schema.get("min_rows", 0)
+    
+    def check(df):
+        if df is None or df.empty:
+            return False, messages["empty"]
+        n_rows, n_columns = df.shape
+        if n_columns < min_columns:
+            return False, messages["min_columns"].format(count=min_columns)
+        missing = [col for col in required_columns if col not in df.columns]
+        if missing:
+            return False, messages["required_columns"].format(columns=", ".join(map(str, missing)))
+        
+        numeric_columns = 0
+        for position, label in enumerate(df.columns):
+            column = df.iloc[:, position]
+            is_numeric = pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+            numeric_columns += is_numeric
+            rule = column_rules.get(label, column_rules.get(position))
+            if not rule:
+                continue
+            values = column
+            if not is_numeric and (rule.get("dtype") == "numeric" or "min" in rule or "max" in rule):
+                values = pd.to_numeric(column, errors="coerce")
+                if rule.get("dtype") == "numeric" and (values.isna() & column.notna()).any():
+                    return False, messages["dtype"].format(column=label)
+            if "min" in rule and values.min() < rule["min"]:
+                return False, messages["min_value"].format(column=label, limit=rule["min"])
+            if "max" in rule and values.max() > rule["max"]:
+                return False, messages["max_value"].format(column=label, limit=rule["max"])
+        
+        if numeric_columns < min_numeric_columns:
+            return False, messages["min_numeric_columns"].format(count=min_numeric_columns)
+        if n_rows < min_rows:
+            return False, messages["min_rows"].format(count=min_rows)
+        return True, ""
+    
+    cache = OrderedDict()
+    lock = threading.Lock()
+    
+    def validator(df, fingerprint=None):
+        if fingerprint is not None:
+            with lock:
+                if fingerprint in cache:
+                    cache.move_to_end(fingerprint)
+                    return cache[fingerprint]
+        verdict = check(df)
+        if fingerprint is not None:
+            with lock:
+                cache[fingerprint] = verdict
+                while len(cache) > cache_size:
+                    cache.popitem(last=False)
+        return verdict
+    
+    return validator
 
 def validate_csv_structure(df, required_columns=None):
     """
@@ -12,50 +122,1021 @@ def validate_csv_structure(df, required_columns=None):
     Returns:
         tuple: (is_valid, error_message)
     """
-    if df is None or df.empty:
-        return False, "CSV file is empty."
+    return compile_schema({"required_columns": required_columns or []})(df)
+
+def dataset_fingerprint(df):
+    """
+    Compute a content hash of a dataframe, used as a cache key
     
-    if required_columns:
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return False, f"Missing required columns: {', '.join(missing_columns)}"
+    Args:
+        df (pandas.DataFrame): The dataframe to fingerprint
+        
+    Returns:
+        str: Hex digest identifying the column names, dtypes and values
+    """
+    digest = hashlib.sha1()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def text_fingerprint(text):
+    """
+    Compute a content hash of pasted or uploaded text, used as a cache key
     
-    return True, ""
+    Args:
+        text (str): The raw text
+        
+    Returns:
+        str: Hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
-def clean_data(df):
+def detect_csv_format(text, sample_lines=50):
     """
-    Clean the dataframe by handling missing values and converting data types
+    Detect the field separator and decimal mark of CSV text
+    
+    The separator is the candidate that appears the same, non-zero number of
+    times on most sampled lines. A comma is taken as the decimal mark when the
+    separator is not a comma and numbers such as "12,5" appear in the sample
+    (French-locale exports).
     
     Args:
-        df (pandas.DataFrame): The dataframe to clean
+        text (str): The CSV text
+        sample_lines (int): Number of non-empty lines to inspect
+        
+    Returns:
+        tuple: (separator, decimal)
+    """
+    lines = [line for line in text.splitlines()[: sample_lines * 2] if line.strip()][:sample_lines]
+    best, best_score = ",", 0
+    for candidate in [";", "\t", ",", "|"]:
+        counts = [line.count(candidate) for line in lines]
+        if not counts or max(counts) == 0:
+            continue
+        mode = max(set(counts), key=counts.count)
+        score = counts.count(mode) * (mode > 0)
+        if score > best_score:
+            best, best_score = candidate, score
+    
+    sample = "\n".join(lines[1:])
+    decimal = "," if best != "," and re.search(r"(?<![\d,])-?\d+,\d+(?![\d,])", sample) else "."
+    return best, decimal
+
+def compact_float_array(values, significant_digits=6):
+    """
+    Convert numeric values to float32 when no precision is lost
+    
+    float32 round-trips any decimal with at most 6 significant digits, which
+    covers typical measurement exports; other columns stay float64.
+    
+    Args:
+        values (array-like): Numeric values (NaN allowed)
+        significant_digits (int): Digits that must survive the conversion
         
     Returns:
-        pandas.DataFrame: The cleaned dataframe
+        numpy.ndarray: float32 or float64 array
+    """
+    if getattr(values, "dtype", None) == np.float32:
+        return np.asarray(values)
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() >= np.finfo(np.float32).max:
+        return values
+    nonzero = finite[finite != 0]
+    exponent = np.floor(np.log10(np.abs(nonzero)))
+    scale = 10.0 ** (significant_digits - 1 - exponent)
+    if np.allclose(np.round(nonzero * scale) / scale, nonzero, rtol=1e-12, atol=0):
+        return values.astype(np.float32)
+    return values
+
+def read_numeric_csv(text, sample_rows=200):
     """
-    # Make a copy to avoid modifying the original
-    cleaned_df = df.copy()
+    Parse CSV text and keep only its numeric columns, as compact float arrays
     
-    # Convert numeric columns to numeric type
-    for col in cleaned_df.columns:
+    The separator and decimal mark are detected first (see
+    `detect_csv_format`). Column types are inferred from the first
+    `sample_rows` rows; the numeric columns are then read in one pass with an
+    explicit float dtype. A column that turns out to hold text further down is
+    coerced, non-numeric cells becoming NaN.
+    
+    Args:
+        text (str): The CSV text
+        sample_rows (int): Number of rows used for type inference
+        
+    Returns:
+        tuple: (dataframe, info) where info holds the separator, the decimal
+        mark, the dropped non-numeric columns and the number of coerced cells
+    """
+    separator, decimal = detect_csv_format(text)
+    options = {"sep": separator, "decimal": decimal}
+    sample = pd.read_csv(StringIO(text), nrows=sample_rows, **options)
+    numeric = [col for col in sample.columns if pd.api.types.is_numeric_dtype(sample[col]) and sample[col].dtype != bool]
+    dropped = [col for col in sample.columns if col not in numeric]
+    
+    coerced = 0
+    try:
+        df = pd.read_csv(StringIO(text), usecols=numeric, dtype={col: np.float64 for col in numeric}, **options)
+    except ValueError:
+        raw = pd.read_csv(StringIO(text), usecols=numeric, dtype=str, keep_default_na=True, **options)
+        if decimal != ".":
+            raw = raw.apply(lambda col: col.str.replace(decimal, ".", regex=False))
+        df = raw.apply(pd.to_numeric, errors="coerce")
+        coerced = int((df.isna() & raw.notna()).to_numpy().sum())
+    
+    df = pd.DataFrame({col: compact_float_array(df[col].to_numpy()) for col in numeric})
+    info = {"separator": separator, "decimal": decimal, "dropped_columns": dropped, "coerced_cells": coerced}
+    return df, info
+
+def to_columnar(df, dictionary_ratio=0.5):
+    """
+    Convert a dataframe to a compact Arrow table
+    
+    Float columns become float32 when no significant digit is lost (see
+    `compact_float_array`), NaN being kept as a value so that columns can be
+    viewed without copy. Text columns are dictionary-encoded when they hold
+    few distinct values, plain Arrow strings otherwise. Categorical columns
+    are dictionary-encoded from their codes, and integer, boolean and
+    datetime columns are kept as they are.
+    
+    Args:
+        df (pandas.DataFrame): The dataframe to convert
+        dictionary_ratio (float): Maximum share of distinct values for dictionary encoding
+        
+    Returns:
+        pyarrow.Table: One contiguous chunk per column
+    """
+    arrays = {}
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_float_dtype(column):
+            arrays[str(name)] = pa.array(compact_float_array(column.to_numpy()))
+        elif pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            arrays[str(name)] = pa.array(column.to_numpy())
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            arrays[str(name)] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0),
+                pa.array(column.cat.categories.astype(str).to_numpy(dtype=object), type=pa.string()),
+            )
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            arrays[str(name)] = pa.array(column)
+        else:
+            text = pa.array(column.astype("string").to_numpy(dtype=object, na_value=None), type=pa.string())
+            if len(text) and column.nunique(dropna=False) <= dictionary_ratio * len(text):
+                text = text.dictionary_encode()
+            arrays[str(name)] = text
+    return pa.table(arrays)
+
+def columnar_view(table):
+    """
+    Build a pandas dataframe over the buffers of an Arrow table
+    
+    Numeric columns wrap the Arrow buffers without copy (read-only),
+    dictionary-encoded columns become pandas categoricals sharing the codes,
+    and strings stay Arrow-backed.
+    
+    Args:
+        table (pyarrow.Table): A table produced by `to_columnar`
+        
+    Returns:
+        pandas.DataFrame: Dataframe view of the table
+    """
+    columns = {}
+    for name, chunked in zip(table.column_names, table.columns):
+        array = chunked.combine_chunks() if chunked.num_chunks != 1 else chunked.chunk(0)
+        if pa.types.is_dictionary(array.type):
+            columns[name] = pd.Categorical.from_codes(
+                array.indices.fill_null(-1).to_numpy(zero_copy_only=False),
+                categories=array.dictionary.to_pandas(),
+            )
+        elif pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+            columns[name] = pd.Series(array, dtype=pd.ArrowDtype(array.type))
+        else:
+            columns[name] = array.to_numpy(zero_copy_only=array.null_count == 0 and not pa.types.is_boolean(array.type))
+    return pd.DataFrame(columns, copy=False)
+
+DATASET_MEMORY_MEGABYTES = 1024
+DATASET_DISK_MEGABYTES = 8192
+DATASET_MMAP_MEGABYTES = 64
+DATASET_HOLDER_TTL = 6 * 3600
+DATASET_SPILL_DIR = os.path.join(tempfile.gettempdir(), "demarche_qualite_datasets")
+DATASET_MANIFEST = "manifest.json"
+
+@st.cache_resource(show_spinner=False)
+def shared_dataset_store():
+    """
+    Process-wide, content-addressable store of the loaded datasets
+    
+    Tables are keyed by content fingerprint and shared by every session.
+    Each entry keeps the sessions and tools holding it (its reference
+    count) and is moved to the end of the LRU order on every access. When
+    the memory budget is exceeded, least recently used tables that no rerun
+    is using are spilled to an Arrow IPC file and memory-mapped back on
+    demand; tables larger than DATASET_MMAP_MEGABYTES are written and
+    mapped right away. Spilled tables nobody holds anymore are deleted once
+    the disk budget is exceeded. The spill directory has a manifest, so
+    files written before a server restart are found again.
+    
+    Returns:
+        dict: Lock, entries (OrderedDict, least recently used first), upload
+        index and cleaning reports of the uploads
+    """
+    os.makedirs(DATASET_SPILL_DIR, exist_ok=True)
+    entries, uploads = _read_dataset_manifest()
+    return {"lock": threading.RLock(), "entries": entries, "uploads": uploads, "reports": {}}
+
+def _read_dataset_manifest():
+    """Rebuild the spilled entries and upload index from the manifest; unlisted files are deleted"""
+    try:
+        with open(os.path.join(DATASET_SPILL_DIR, DATASET_MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    entries = OrderedDict()
+    for fingerprint, info in manifest.get("datasets", {}).items():
+        path = os.path.join(DATASET_SPILL_DIR, info["file"])
+        if os.path.exists(path):
+            entries[fingerprint] = {"table": None, "view": None, "nbytes": info["nbytes"], "path": path, "mapped": False, "holders": {}}
+    known = {os.path.basename(entry["path"]) for entry in entries.values()}
+    for name in os.listdir(DATASET_SPILL_DIR):
+        if name.endswith((".arrow", ".tmp")) and name not in known:
+            try:
+                os.remove(os.path.join(DATASET_SPILL_DIR, name))
+            except OSError:
+                pass
+    uploads = {(digest, tuple(columns)): fingerprint for digest, columns, fingerprint in manifest.get("uploads", []) if fingerprint in entries}
+    return entries, uploads
+
+def _write_dataset_manifest(shared):
+    """Record the spilled entries and their uploads; written atomically"""
+    datasets = {
+        fingerprint: {"file": os.path.basename(entry["path"]), "nbytes": entry["nbytes"]}
+        for fingerprint, entry in shared["entries"].items()
+        if entry["path"] is not None
+    }
+    manifest = {
+        "datasets": datasets,
+        "uploads": [[digest, list(columns), fingerprint] for (digest, columns), fingerprint in shared["uploads"].items() if fingerprint in datasets],
+    }
+    path = os.path.join(DATASET_SPILL_DIR, DATASET_MANIFEST)
+    with open(f"{path}.{uuid.uuid4().hex}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f.name, path)
+
+def _write_spill(fingerprint, table):
+    """Write a table to an Arrow IPC file in the spill directory"""
+    path = os.path.join(DATASET_SPILL_DIR, f"{fingerprint}.arrow")
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(temporary, path)
+    return path
+
+def _map_spill(path):
+    """Open a spilled table over memory-mapped buffers: pages are read on access and reclaimable by the OS"""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def _live_holders(entry, now):
+    """Drop holders not seen for DATASET_HOLDER_TTL seconds (closed sessions) and return the others"""
+    entry["holders"] = {holder: seen for holder, seen in entry["holders"].items() if now - seen < DATASET_HOLDER_TTL}
+    return entry["holders"]
+
+def _view_in_use(entry):
+    """Whether the dataframe view of an entry is referenced outside the store (a rerun still using it)"""
+    # References: the entry itself and the getrefcount argument
+    return entry["view"] is not None and sys.getrefcount(entry["view"]) > 2
+
+def _enforce_dataset_budgets(shared):
+    """
+    Spill least recently used tables to disk, then delete unheld spills, until both budgets are met
+    
+    A table whose view is still referenced elsewhere is not spilled: its
+    buffers would stay resident, and mapping it back would add a copy.
+    """
+    entries, now = shared["entries"], time.time()
+    # Memory-mapped tables are backed by their file and not counted
+    in_memory = sum(entry["nbytes"] for entry in entries.values() if entry["table"] is not None and not entry["mapped"])
+    for fingerprint, entry in list(entries.items())[:-1]:
+        if in_memory <= DATASET_MEMORY_MEGABYTES * 2**20:
+            break
+        if entry["table"] is None or entry["mapped"] or _view_in_use(entry):
+            continue
+        if entry["path"] is None:
+            entry["path"] = _write_spill(fingerprint, entry["table"])
+        entry["table"] = entry["view"] = None
+        in_memory -= entry["nbytes"]
+    
+    on_disk = sum(entry["nbytes"] for entry in entries.values() if entry["path"] is not None)
+    for fingerprint, entry in list(entries.items()):
+        if on_disk <= DATASET_DISK_MEGABYTES * 2**20:
+            break
+        if entry["path"] is None or _live_holders(entry, now):
+            continue
+        on_disk -= entry["nbytes"]
         try:
-            cleaned_df[col] = pd.to_numeric(cleaned_df[col])
-        except:
-            # If conversion fails, it's probably not a numeric column
+            os.remove(entry["path"])
+        except OSError:
             pass
+        entry["path"] = None
+        if entry["table"] is None or entry["mapped"]:
+            del entries[fingerprint]
+    shared["uploads"] = {upload: fingerprint for upload, fingerprint in shared["uploads"].items() if fingerprint in entries}
+    _write_dataset_manifest(shared)
+
+def store_dataset(df, fingerprint=None):
+    """
+    Add a dataframe to the shared store, converting it only if its content is new
     
-    # Handle missing values
-    numeric_cols = cleaned_df.select_dtypes(include=np.number).columns
-    categorical_cols = cleaned_df.select_dtypes(exclude=np.number).columns
+    Args:
+        df (pandas.DataFrame): The loaded data
+        fingerprint (str, optional): Precomputed `dataset_fingerprint(df)`
+        
+    Returns:
+        str: The fingerprint, used as handle by `load_dataset`
+    """
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    shared = shared_dataset_store()
+    with shared["lock"]:
+        if fingerprint in shared["entries"]:
+            return fingerprint
+    # Conversion outside the lock: other sessions keep reading meanwhile
+    table = to_columnar(df)
+    path, mapped = None, table.nbytes > DATASET_MMAP_MEGABYTES * 2**20
+    if mapped:
+        path = _write_spill(fingerprint, table)
+        table = _map_spill(path)
+    with shared["lock"]:
+        if fingerprint not in shared["entries"]:
+            shared["entries"][fingerprint] = {
+                "table": table,
+                "view": columnar_view(table),
+                "nbytes": table.nbytes,
+                "path": path,
+                "mapped": mapped,
+                "holders": {},
+            }
+            _enforce_dataset_budgets(shared)
+    return fingerprint
+
+def load_dataset(fingerprint, holder=None):
+    """
+    Get a stored table and its dataframe view, mapping it from disk if it was spilled
+    
+    Args:
+        fingerprint (str): Handle returned by `store_dataset`
+        holder (tuple, optional): (session, owner) pair to record as a reference
+        
+    Returns:
+        dict: {"table": pyarrow.Table, "view": pandas.DataFrame}, or None when unknown
+    """
+    shared = shared_dataset_store()
+    with shared["lock"]:
+        entry = shared["entries"].get(fingerprint)
+        if entry is None:
+            return None
+        shared["entries"].move_to_end(fingerprint)
+        if holder is not None:
+            entry["holders"][holder] = time.time()
+        if entry["table"] is None:
+            table = _map_spill(entry["path"])
+            entry["table"], entry["view"], entry["mapped"] = table, columnar_view(table), True
+        return {"table": entry["table"], "view": entry["view"]}
+
+def _release_holder(fingerprint, holder):
+    """Remove a reference to a stored dataset"""
+    shared = shared_dataset_store()
+    with shared["lock"]:
+        entry = shared["entries"].get(fingerprint)
+        if entry is not None:
+            entry["holders"].pop(holder, None)
+            _enforce_dataset_budgets(shared)
+
+def _dataset_holder(store, owner):
+    """Reference key of a tool in a session: one random token per session"""
+    return store.setdefault("dataset_session", uuid.uuid4().hex), owner
+
+def _hold_dataset(store, owner, fingerprint):
+    """Point a session tool at a stored dataset; returns its view, or None when it is not stored"""
+    owners = store.setdefault("dataset_owners", {})
+    holder = _dataset_holder(store, owner)
+    loaded = load_dataset(fingerprint, holder)
+    if loaded is None:
+        return None
+    previous = owners.get(owner)
+    if previous is not None and previous != fingerprint:
+        _release_holder(previous, holder)
+    owners[owner] = fingerprint
+    return loaded["view"]
+
+def register_dataset(store, owner, df, fingerprint=None):
+    """
+    Reference a tool's dataset in the shared store from a session
+    
+    Tables are keyed by content fingerprint, so the same data loaded by two
+    tools, by two sessions or on every rerun is converted and stored only
+    once (see `shared_dataset_store`). The session only keeps the
+    fingerprint of each tool's dataset as a handle: tools resolve it with
+    `dataset_view` on every rerun rather than keeping the returned view in
+    the session, so that a spilled table is not held in memory by a session.
+    
+    Args:
+        store (MutableMapping): Session storage, typically `st.session_state`
+        owner (str): Name of the tool registering the data
+        df (pandas.DataFrame): The loaded data
+        fingerprint (str, optional): Precomputed `dataset_fingerprint(df)`
+        
+    Returns:
+        pandas.DataFrame: Zero-copy view of the stored table (see `columnar_view`)
+    """
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    view = _hold_dataset(store, owner, fingerprint)
+    if view is None:
+        view = _hold_dataset(store, owner, store_dataset(df, fingerprint))
+    return view
+
+def dataset_view(store, owner):
+    """
+    Resolve a tool's registered dataset to its dataframe view
+    
+    Meant to be called on every rerun: the view is not kept in the session,
+    and a table spilled to disk in the meantime comes back memory-mapped.
+    
+    Args:
+        store (MutableMapping): Session storage used with `register_dataset`
+        owner (str): Name of the tool that registered the data
+        
+    Returns:
+        pandas.DataFrame: Zero-copy view of the stored table, or None when the
+        tool has no dataset or it is no longer stored
+    """
+    fingerprint = store.get("dataset_owners", {}).get(owner)
+    loaded = load_dataset(fingerprint, _dataset_holder(store, owner)) if fingerprint else None
+    return loaded["view"] if loaded is not None else None
+
+def dataset_column(store, owner, column, df=None):
+    """
+    Return a column of a registered dataset as a numpy array, without copy when possible
+    
+    The stored table may have been evicted (memory or disk budget, expired
+    holder); it is then registered again from `df`, typically the view
+    resolved on this rerun, or a clear error asks the user to reload the data.
+    
+    Args:
+        store (MutableMapping): Session storage used with `register_dataset`
+        owner (str): Name of the tool that registered the data
+        column (str): Column name
+        df (pandas.DataFrame, optional): The tool's dataset, used to register it again
+        
+    Returns:
+        numpy.ndarray: Column values (read-only when zero-copy)
+        
+    Raises:
+        LookupError: The dataset is no longer stored and `df` was not given
+    """
+    fingerprint = store.get("dataset_owners", {}).get(owner)
+    loaded = load_dataset(fingerprint, _dataset_holder(store, owner)) if fingerprint else None
+    if loaded is None and df is not None:
+        register_dataset(store, owner, df, fingerprint)
+        loaded = load_dataset(store["dataset_owners"][owner], _dataset_holder(store, owner))
+    if loaded is None:
+        raise LookupError("les données ne sont plus disponibles en mémoire, veuillez les recharger.")
+    table = loaded["table"]
+    chunked = table.column(column)
+    array = chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    return array.to_numpy(zero_copy_only=False)
+
+def release_dataset(store, owner):
+    """
+    Drop a tool's reference to its registered dataset
+    
+    Args:
+        store (MutableMapping): Session storage used with `register_dataset`
+        owner (str): Name of the tool that registered the data
+    """
+    fingerprint = store.get("dataset_owners", {}).pop(owner, None)
+    if fingerprint is not None:
+        _release_holder(fingerprint, _dataset_holder(store, owner))
+
+def table_format(name):
+    """
+    Identify an uploaded file format from its name
+    
+    Args:
+        name (str): File name
+        
+    Returns:
+        str: "csv", "parquet" or "xlsx"
+    """
+    extension = name.rsplit(".", 1)[-1].lower()
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension in ("xlsx", "xlsm"):
+        return "xlsx"
+    return "csv"
+
+def _csv_options(file):
+    """Detect encoding, separator and decimal mark from the first 64 KB of a CSV file"""
+    file.seek(0)
+    head = file.read(65536)
+    file.seek(0)
+    try:
+        text, encoding = head.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError as error:
+        # Multi-byte character cut at the end of the sample
+        if error.start >= len(head) - 3:
+            text, encoding = head[: error.start].decode("utf-8"), "utf-8"
+        else:
+            text, encoding = head.decode("cp1252", errors="replace"), "cp1252"
+    separator, decimal = detect_csv_format(text)
+    return {"sep": separator, "decimal": decimal, "encoding": encoding}
+
+def list_table_columns(file, name):
+    """
+    Read only the column names of an uploaded CSV/TSV, Parquet or XLSX file
+    
+    Args:
+        file (file-like): Binary file object (seekable)
+        name (str): File name, used to identify the format
+        
+    Returns:
+        list: Column names
+    """
+    file_format = table_format(name)
+    try:
+        if file_format == "parquet":
+            return pq.read_schema(file).names
+        if file_format == "xlsx":
+            import openpyxl
+            
+            workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+            header = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+            workbook.close()
+            return [str(value) for value in header if value is not None]
+        return pd.read_csv(file, nrows=0, **_csv_options(file)).columns.tolist()
+    finally:
+        file.seek(0)
+
+def _iter_arrow_csv_chunks(file, columns, block_bytes=16 * 2**20):
+    """
+    Yield (dataframe chunk, fraction read) for a CSV file with the Arrow streaming reader
+    
+    Much faster than the pandas parser, and ISO timestamps are parsed
+    natively. Column types are inferred on the first block: a later block
+    that does not match raises `pyarrow.ArrowInvalid`.
+    """
+    options = _csv_options(file)
+    size = max(getattr(file, "size", 0) or len(file.getvalue()), 1)
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(block_size=block_bytes, encoding=options["encoding"]),
+        parse_options=pa_csv.ParseOptions(delimiter=options["sep"]),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns or [], decimal_point=options["decimal"], strings_can_be_null=True
+        ),
+    )
+    for batch in reader:
+        yield batch.to_pandas(), file.tell() / size
+
+def _iter_table_chunks(file, name, columns, chunk_rows):
+    """Yield (dataframe chunk, fraction read) for an uploaded file"""
+    file_format = table_format(name)
+    if file_format == "parquet":
+        parquet = pq.ParquetFile(file)
+        total, read = max(parquet.metadata.num_rows, 1), 0
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            read += batch.num_rows
+            yield batch.to_pandas(), read / total
+    elif file_format == "xlsx":
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(rows, ())]
+        keep = [i for i, col in enumerate(header) if columns is None or col in columns]
+        names = [header[i] for i in keep]
+        total, buffer, read = max((sheet.max_row or 1) - 1, 1), [], 0
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in keep])
+            if len(buffer) == chunk_rows:
+                read += len(buffer)
+                yield pd.DataFrame(buffer, columns=names), read / total
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names), 1.0
+        workbook.close()
+    else:
+        size = max(getattr(file, "size", 0) or len(file.getvalue()), 1)
+        reader = pd.read_csv(file, usecols=columns, chunksize=chunk_rows, **_csv_options(file))
+        with reader:
+            for chunk in reader:
+                yield chunk, file.tell() / size
+
+def _text_column_plan(chunk, parse_dates, sample_size=1000, threshold=0.95):
+    """Decide from the first chunk how each text column is stored: ("datetime", format) or ("category", None)"""
+    plan = {}
+    for col in chunk.columns:
+        column = chunk[col]
+        if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            continue
+        if pd.api.types.is_datetime64_any_dtype(column) or isinstance(column.dtype, pd.CategoricalDtype):
+            continue
+        sample = column.dropna().head(sample_size).astype(str)
+        if parse_dates and len(sample):
+            date_format = guess_datetime_format(sample.iloc[0])
+            if date_format and pd.to_datetime(sample, format=date_format, errors="coerce").notna().mean() >= threshold:
+                plan[col] = ("datetime", date_format)
+                continue
+        plan[col] = ("category", None)
+    return plan
+
+def _apply_text_column_plan(chunk, plan):
+    """Convert the text columns of a chunk as decided by `_text_column_plan`"""
+    for col, (kind, date_format) in plan.items():
+        if kind == "datetime":
+            chunk[col] = pd.to_datetime(chunk[col], format=date_format, errors="coerce")
+        else:
+            chunk[col] = chunk[col].astype("category")
+    return chunk
+
+def _concat_chunks(chunks):
+    """Concatenate chunks; categorical columns are merged with `union_categoricals`, without going back to text"""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Series(union_categoricals([chunk[col] for chunk in chunks]))
+        else:
+            columns[col] = pd.concat([chunk[col] for chunk in chunks], ignore_index=True)
+    return pd.DataFrame(columns, columns=chunks[0].columns)
+
+def read_table(
+    file,
+    name,
+    columns=None,
+    chunk_rows=100_000,
+    max_bytes=512 * 2**20,
+    progress=None,
+    categorical=False,
+    parse_dates=False,
+):
+    """
+    Read an uploaded CSV/TSV, Parquet or XLSX file in chunks
+    
+    Only `columns` are materialised (column projection). Memory use is
+    checked after every chunk, and reading stops as soon as the loaded data
+    exceeds `max_bytes`. Optionally, text columns are converted chunk by
+    chunk, as decided from the first chunk: timestamps are parsed with
+    their detected format and other text becomes categorical, which keeps
+    large logs with repeated identifiers compact.
+    
+    Args:
+        file (file-like): Binary file object (seekable), e.g. a Streamlit UploadedFile
+        name (str): File name, used to identify the format
+        columns (list, optional): Columns to load; all columns when None
+        chunk_rows (int): Rows per chunk
+        max_bytes (int): Memory cap for the loaded data
+        progress (callable, optional): Called with the fraction read after each chunk
+        categorical (bool): Store text columns as categoricals
+        parse_dates (bool): Parse text columns holding timestamps
+        
+    Returns:
+        pandas.DataFrame: The loaded data
+        
+    Raises:
+        ValueError: When the memory cap is exceeded
+    """
+    compact = categorical or parse_dates
+    if compact and table_format(name) == "csv":
+        # Fast path: Arrow reader, falling back to pandas if a block does not match the inferred types
+        try:
+            file.seek(0)
+            return _load_chunks(
+                _iter_arrow_csv_chunks(file, columns), file, columns, max_bytes, progress, categorical, parse_dates
+            )
+        except pa.ArrowInvalid:
+            pass
+    file.seek(0)
+    return _load_chunks(
+        _iter_table_chunks(file, name, columns, chunk_rows), file, columns, max_bytes, progress, categorical, parse_dates
+    )
+
+def _load_chunks(chunk_iter, file, columns, max_bytes, progress, categorical, parse_dates):
+    """Convert, check against the memory cap and concatenate the chunks read by `read_table`"""
+    chunks, used, plan = [], 0, None
+    for chunk, fraction in chunk_iter:
+        if categorical or parse_dates:
+            if plan is None:
+                plan = {
+                    col: (kind, date_format)
+                    for col, (kind, date_format) in _text_column_plan(chunk, parse_dates).items()
+                    if kind == "datetime" or categorical
+                }
+            chunk = _apply_text_column_plan(chunk, plan)
+        used += int(chunk.memory_usage(deep=True).sum())
+        if used > max_bytes:
+            raise ValueError(
+                f"Le fichier dépasse la limite mémoire de {max_bytes / 2**20:.0f} Mo : "
+                "sélectionnez moins de colonnes."
+            )
+        chunks.append(chunk)
+        if progress is not None:
+            progress(min(fraction, 1.0))
+    file.seek(0)
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return _concat_chunks(chunks)
+
+def dataset_uploader(key, max_megabytes=512, chunk_rows=100_000, categorical=False, parse_dates=False):
+    """
+    File uploader shared by the data tools (CSV/TSV, Parquet, XLSX)
+    
+    The user picks the columns to load; the file is then read in chunks with
+    a progress bar, optionally cleaned with `clean_data` (whose report is
+    displayed) and stored once through `register_dataset`. Uploads are also
+    indexed by the hash of their bytes, the selected columns and the
+    cleaning option, so the same file uploaded again, by any session, reuses
+    the stored table without being parsed.
+    
+    Args:
+        key (str): Widget key prefix, also used as dataset owner
+        max_megabytes (int): Memory cap for the loaded data
+        chunk_rows (int): Rows per chunk
+        categorical (bool): Store text columns as categoricals (see `read_table`)
+        parse_dates (bool): Parse text columns holding timestamps while reading
+        
+    Returns:
+        tuple: (dataframe view, fingerprint), or None when nothing is loaded
+    """
+    uploaded = st.file_uploader(
+        "Importer un fichier (CSV, TSV, Parquet, Excel) :",
+        type=["csv", "tsv", "txt", "parquet", "xlsx"],
+        key=key,
+    )
+    if uploaded is None:
+        release_dataset(st.session_state, key)
+        st.session_state.pop(f"{key}_loaded", None)
+        return None
+    
+    try:
+        available = list_table_columns(uploaded, uploaded.name)
+    except Exception as e:
+        st.error(f"Erreur de lecture : {e}")
+        return None
+    # All columns by default; reset when the file changes
+    columns_key = f"{key}_columns"
+    st.session_state[columns_key] = [col for col in st.session_state.get(columns_key, []) if col in available] or available
+    selected = st.multiselect(
+        "Colonnes à charger :",
+        available,
+        key=columns_key,
+        help="Seules les colonnes sélectionnées sont lues et gardées en mémoire.",
+    )
+    if not selected:
+        st.info("Sélectionnez au moins une colonne.")
+        return None
+    clean = st.checkbox(
+        "Nettoyer les données (nombres saisis en texte, valeurs manquantes)",
+        key=f"{key}_clean",
+        help="Convertit les colonnes numériques lues comme du texte et complète les valeurs manquantes "
+        "(médiane ou « Unknown »). Les textes non convertibles restent manquants et sont signalés.",
+    )
+    
+    # Hash the bytes only when this session sees a new file, column selection or cleaning option
+    token = (getattr(uploaded, "file_id", None), uploaded.name, uploaded.size, tuple(selected), clean)
+    loaded = st.session_state.get(f"{key}_loaded")
+    shared = shared_dataset_store()
+    if loaded is None or loaded["token"] != token:
+        # Loading options are part of the digest, keeping the manifest's (digest, columns) keys
+        options = [name for name, enabled in (("clean", clean), ("categorical", categorical), ("dates", parse_dates)) if enabled]
+        digest = hashlib.sha1(uploaded.getbuffer()).hexdigest() + "".join(f"+{name}" for name in options)
+        upload = (digest, tuple(selected))
+        with shared["lock"]:
+            fingerprint = shared["uploads"].get(upload)
+        loaded = {"token": token, "upload": upload, "fingerprint": fingerprint}
+    
+    view = _hold_dataset(st.session_state, key, loaded["fingerprint"]) if loaded["fingerprint"] else None
+    if view is None:
+        df = _read_with_progress(uploaded, selected, max_megabytes, chunk_rows, categorical, parse_dates)
+        if df is None:
+            return None
+        report = None
+        if clean:
+            df, report = clean_data(df, return_report=True)
+        loaded["fingerprint"] = dataset_fingerprint(df)
+        view = register_dataset(st.session_state, key, df, loaded["fingerprint"])
+        with shared["lock"]:
+            shared["uploads"][loaded["upload"]] = loaded["fingerprint"]
+            if report is not None:
+                shared["reports"][loaded["fingerprint"]] = report
+            _write_dataset_manifest(shared)
+    st.session_state[f"{key}_loaded"] = loaded
+    
+    st.caption(f"{len(view)} lignes × {len(view.columns)} colonnes chargées depuis {uploaded.name}.")
+    if clean:
+        _show_cleaning_report(shared["reports"].get(loaded["fingerprint"]))
+    return view, loaded["fingerprint"]
+
+def _show_cleaning_report(report):
+    """Display the `clean_data` report of an upload, warning about text left unconverted"""
+    if report is None:
+        st.caption("Données nettoyées lors d'un import précédent (rapport non conservé).")
+        return
+    with st.expander("Rapport de nettoyage", expanded=False):
+        st.dataframe(
+            report.assign(
+                unparsed_examples=report["unparsed_examples"].map(", ".join),
+                fill_value=report["fill_value"].map(lambda value: "" if value is None else str(value)),
+            ).rename(
+                columns={
+                    "column": "Colonne",
+                    "inferred_type": "Type détecté",
+                    "missing_before": "Valeurs manquantes",
+                    "conversion_errors": "Textes non convertis",
+                    "unparsed_examples": "Exemples",
+                    "filled": "Valeurs complétées",
+                    "fill_value": "Valeur de remplacement",
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+    unconverted = report[report["conversion_errors"] > 0]
+    if not unconverted.empty:
+        st.warning(
+            "Valeurs non numériques laissées manquantes : "
+            + ", ".join(f"{row.column} ({row.conversion_errors})" for row in unconverted.itertuples())
+            + "."
+        )
+
+def _read_with_progress(uploaded, columns, max_megabytes, chunk_rows, categorical=False, parse_dates=False):
+    """Read an uploaded file with a Streamlit progress bar; errors are displayed and return None"""
+    bar = st.progress(0.0, text=f"Lecture de {uploaded.name}…")
+    try:
+        df = read_table(
+            uploaded,
+            uploaded.name,
+            columns=columns,
+            chunk_rows=chunk_rows,
+            max_bytes=max_megabytes * 2**20,
+            progress=lambda fraction: bar.progress(fraction, text=f"Lecture de {uploaded.name}… {100 * fraction:.0f} %"),
+            categorical=categorical,
+            parse_dates=parse_dates,
+        )
+    except Exception as e:
+        bar.empty()
+        st.error(f"Erreur de lecture : {e}")
+        return None
+    bar.empty()
+    return df
+
+NUMBER_PATTERN = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+def coerce_numeric(column):
+    """
+    Convert a text column to float64 in one bulk pass
+    
+    The conversion runs on the Arrow string buffer: a direct cast when every
+    value parses, otherwise values not matching a plain decimal number are
+    nulled before casting. Mixed-type object columns fall back to
+    `pd.to_numeric`.
+    
+    Args:
+        column (pandas.Series): The column to convert
+        
+    Returns:
+        pandas.Series: float64 values, NaN where the text did not parse
+    """
+    try:
+        text = pc.utf8_trim_whitespace(pa.array(column, type=pa.string(), from_pandas=True))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pd.to_numeric(column, errors="coerce").astype(np.float64)
+    try:
+        numbers = pc.cast(text, pa.float64())
+    except pa.ArrowInvalid:
+        numbers = pc.cast(pc.if_else(pc.match_substring_regex(text, NUMBER_PATTERN), text, None), pa.float64())
+    return pd.Series(numbers.to_numpy(zero_copy_only=False), index=column.index, name=column.name)
+
+def infer_column_types(df, sample_size=1000, numeric_threshold=0.95, seed=0):
+    """
+    Infer which columns hold numbers, looking at a random sample of rows only
+    
+    Numeric, boolean and datetime dtypes are taken as they are. For text columns, a
+    sample of `sample_size` non-missing values is parsed; the column is
+    considered numeric when at least `numeric_threshold` of them parse.
+    
+    Args:
+        df (pandas.DataFrame): The dataframe to inspect
+        sample_size (int): Number of values parsed per text column
+        numeric_threshold (float): Share of parsable values required
+        seed (int): Seed of the row sampler
+        
+    Returns:
+        dict: column name -> "numeric", "boolean", "datetime" or "text"
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.integers(0, len(df), size=min(sample_size, len(df))) if len(df) else np.array([], dtype=int)
+    types = {}
+    for col in df.columns:
+        column = df[col]
+        if pd.api.types.is_bool_dtype(column):
+            types[col] = "boolean"
+        elif pd.api.types.is_numeric_dtype(column):
+            types[col] = "numeric"
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            types[col] = "datetime"
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            types[col] = "text"
+        else:
+            sample = column.iloc[positions].dropna()
+            if sample.empty:
+                sample = column.dropna().head(sample_size)
+            parsed = pd.to_numeric(sample, errors="coerce")
+            share = parsed.notna().mean() if len(sample) else 0.0
+            types[col] = "numeric" if share >= numeric_threshold else "text"
+    return types
+
+def clean_data(df, return_report=False, sample_size=1000, numeric_threshold=0.95):
+    """
+    Clean the dataframe by handling missing values and converting data types
+    
+    Column types are inferred from a sample (see `infer_column_types`); text
+    columns detected as numeric are converted in one bulk coercion, values
+    that do not parse becoming missing. Missing values are then filled in one
+    vectorised pass: median for numeric columns, "Unknown" for text columns;
+    dates are left as read.
+    Values that were present but did not parse are not imputed: they stay
+    missing and are listed in the report. The input dataframe is not modified.
+    
+    Args:
+        df (pandas.DataFrame): The dataframe to clean
+        return_report (bool): Also return the per-column cleaning report
+        sample_size (int): Number of values used to infer each column type
+        numeric_threshold (float): Share of parsable values for a numeric column
+        
+    Returns:
+        pandas.DataFrame: The cleaned dataframe, or (cleaned dataframe, report)
+        when `return_report` is True. The report lists, per column, the
+        inferred type, missing values before cleaning, values that failed
+        numeric conversion (left missing, with a few examples), filled
+        values and the fill value.
+    """
+    types = infer_column_types(df, sample_size, numeric_threshold)
+    missing_before = df.isna().sum()
+    
+    columns = {}
+    unparsed = {}
+    for col in df.columns:
+        column = df[col]
+        if types[col] == "numeric" and not pd.api.types.is_numeric_dtype(column):
+            converted = coerce_numeric(column)
+            failed = converted.isna() & column.notna()
+            if failed.any():
+                unparsed[col] = failed
+            column = converted
+        columns[col] = column
+    cleaned_df = pd.DataFrame(columns, index=df.index)
+    
+    numeric_cols = [col for col in df.columns if types[col] == "numeric"]
+    text_cols = [col for col in df.columns if types[col] == "text"]
+    fill_values = {}
     
     # Fill missing numeric values with the median
-    if not numeric_cols.empty:
-        cleaned_df[numeric_cols] = cleaned_df[numeric_cols].fillna(cleaned_df[numeric_cols].median())
+    if numeric_cols:
+        fill_values.update(cleaned_df[numeric_cols].median().to_dict())
     
     # Fill missing categorical values with "Unknown"
-    if not categorical_cols.empty:
-        cleaned_df[categorical_cols] = cleaned_df[categorical_cols].fillna("Unknown")
+    for col in text_cols:
+        column = cleaned_df[col]
+        if isinstance(column.dtype, pd.CategoricalDtype) and "Unknown" not in column.cat.categories:
+            cleaned_df[col] = column.cat.add_categories("Unknown")
+        fill_values[col] = "Unknown"
     
-    return cleaned_df
+    cleaned_df = cleaned_df.fillna(fill_values)
+    # Text that failed numeric conversion is reported, not replaced by the median
+    for col, failed in unparsed.items():
+        cleaned_df[col] = cleaned_df[col].mask(failed)
+    
+    if not return_report:
+        return cleaned_df
+    
+    report = pd.DataFrame(
+        {
+            "column": list(df.columns),
+            "inferred_type": [types[col] for col in df.columns],
+            "missing_before": [int(missing_before[col]) for col in df.columns],
+            "conversion_errors": [int(unparsed[col].sum()) if col in unparsed else 0 for col in df.columns],
+            "unparsed_examples": [
+                df[col][unparsed[col]].astype(str).unique()[:5].tolist() if col in unparsed else [] for col in df.columns
+            ],
+            "filled": [int(missing_before[col]) if col in fill_values else 0 for col in df.columns],
+            "fill_value": [fill_values.get(col) for col in df.columns],
+        }
+    )
+    return cleaned_df, report
 
 def sample_data_generator(data_type):
     """
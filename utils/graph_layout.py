@@ -0,0 +1,528 @@
+import hashlib
+import heapq
+import textwrap
+import threading
+import time
+from collections import OrderedDict, deque
+
+LAYOUT_CACHE_SIZE = 64
+LAYOUT_TIMINGS = deque(maxlen=200)
+_layout_cache = OrderedDict()
+_layout_lock = threading.Lock()
+
+def structure_fingerprint(kind, structure):
+    """
+    Compute a hash of a graph structure, used as a layout cache key
+    
+    Args:
+        kind (str): Layout name, so that different layouts never share keys
+        structure: Node ids and edges (or widths and parents for trees), without labels
+    
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha1(repr((kind, structure)).encode("utf-8")).hexdigest()
+
+def cached_layout(kind, structure, compute):
+    """
+    Return a layout from the process-wide cache, computing it on a miss
+    
+    Layouts are keyed by `structure_fingerprint`: editing labels, colours
+    or node types reuses the positions. Each call is timed; the timing is
+    returned to the caller, which displays it, and also recorded in
+    `LAYOUT_TIMINGS` for aggregate diagnostics across sessions.
+    
+    Args:
+        kind (str): Layout name
+        structure: Hashable description of the graph, see `structure_fingerprint`
+        compute (callable): Computes the layout on a cache miss
+    
+    Returns:
+        tuple: (layout, timing) where timing is a dict with layout, seconds and cached
+    """
+    key = structure_fingerprint(kind, structure)
+    start = time.perf_counter()
+    with _layout_lock:
+        layout = _layout_cache.get(key)
+        if layout is not None:
+            _layout_cache.move_to_end(key)
+    cached = layout is not None
+    if not cached:
+        layout = compute()
+        with _layout_lock:
+            _layout_cache[key] = layout
+            while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+                _layout_cache.popitem(last=False)
+    timing = {"layout": kind, "seconds": time.perf_counter() - start, "cached": cached}
+    LAYOUT_TIMINGS.append(timing)
+    return layout, timing
+
+def layout_timings(kind=None):
+    """
+    List the recorded layout timings, most recent last
+    
+    The history is process-wide: entries come from every session, so it is
+    meant for aggregate diagnostics; a caller displaying the timing of its
+    own layout uses the timing returned with it.
+    
+    Args:
+        kind (str, optional): Only keep this layout
+    
+    Returns:
+        list: Timing dicts (layout, seconds, cached)
+    """
+    return [timing for timing in list(LAYOUT_TIMINGS) if kind is None or timing["layout"] == kind]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Layered (Sugiyama) layout for directed graphs, loops included
+# ─────────────────────────────────────────────────────────────────────────────
+def break_cycles(node_ids, edges):
+    """
+    Find the edges to reverse to make a directed graph acyclic
+    
+    Eades-Lin-Smyth greedy heuristic: sinks go to the end, sources to the
+    start, otherwise the node closest to the start of the process (breadth-
+    first distance) and then the one with the most outgoing over incoming
+    edges. Edges going back in this order (rework loops) are reversed for
+    layering and drawn in their original direction.
+    
+    Args:
+        node_ids (list): Node ids
+        edges (list): (source, target) pairs, without self-loops
+    
+    Returns:
+        set: Edges to reverse
+    """
+    successors = {n: set() for n in node_ids}
+    predecessors = {n: set() for n in node_ids}
+    for src, tgt in edges:
+        successors[src].add(tgt)
+        predecessors[tgt].add(src)
+    index = {n: i for i, n in enumerate(node_ids)}
+    
+    # Distance from the start; nodes not reached come last
+    depth = {n: 0 for n in node_ids if not predecessors[n]}
+    queue = deque(depth)
+    for start in node_ids:
+        if start not in depth:
+            depth[start] = len(node_ids)
+            queue.append(start)
+        while queue:
+            node = queue.popleft()
+            for child in successors[node]:
+                if child not in depth:
+                    depth[child] = depth[node] + 1
+                    queue.append(child)
+    
+    def priority(node):
+        return depth[node], len(predecessors[node]) - len(successors[node]), index[node], node
+    
+    remaining = set(node_ids)
+    left, right = [], []
+    heap = [priority(n) for n in node_ids]
+    heapq.heapify(heap)
+    sinks = deque(n for n in node_ids if not successors[n])
+    sources = deque(n for n in node_ids if not predecessors[n])
+    
+    def remove(node):
+        remaining.discard(node)
+        for child in successors[node]:
+            predecessors[child].discard(node)
+            if not predecessors[child]:
+                sources.append(child)
+            heapq.heappush(heap, priority(child))
+        for parent in predecessors[node]:
+            successors[parent].discard(node)
+            if not successors[parent]:
+                sinks.append(parent)
+            heapq.heappush(heap, priority(parent))
+    
+    while remaining:
+        if sinks:
+            node = sinks.popleft()
+            if node in remaining:
+                right.append(node)
+                remove(node)
+        elif sources:
+            node = sources.popleft()
+            if node in remaining:
+                left.append(node)
+                remove(node)
+        else:
+            # Stale heap entries are skipped: only the current degrees count
+            entry = heapq.heappop(heap)
+            node = entry[-1]
+            if node in remaining and entry == priority(node):
+                left.append(node)
+                remove(node)
+    
+    rank = {n: i for i, n in enumerate(left + right[::-1])}
+    return {(src, tgt) for src, tgt in edges if rank[src] > rank[tgt]}
+
+def longest_path_layers(node_ids, edges):
+    """
+    Assign each node of a DAG to the layer given by its longest path from a source
+    
+    Nodes with more outgoing than incoming edges (sources in particular)
+    are then moved down just above their first successor, which shortens
+    edges and avoids thousands of dummy nodes.
+    
+    Args:
+        node_ids (list): Node ids
+        edges (list): (source, target) pairs of an acyclic graph
+    
+    Returns:
+        dict: Node id -> layer index (0 at the top)
+    """
+    successors = {n: [] for n in node_ids}
+    indegree = dict.fromkeys(node_ids, 0)
+    for src, tgt in edges:
+        successors[src].append(tgt)
+        indegree[tgt] += 1
+    incoming = dict(indegree)
+    
+    layer = dict.fromkeys(node_ids, 0)
+    order = []
+    queue = deque(n for n in node_ids if indegree[n] == 0)
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for child in successors[node]:
+            layer[child] = max(layer[child], layer[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+    
+    for node in reversed(order):
+        if len(successors[node]) > incoming[node]:
+            layer[node] = min(layer[child] for child in successors[node]) - 1
+    return layer
+
+def count_crossings(upper_order, lower_order, down):
+    """
+    Count edge crossings between two adjacent layers (inversions, Fenwick tree)
+    
+    Args:
+        upper_order (list): Nodes of the upper layer, in order
+        lower_order (list): Nodes of the lower layer, in order
+        down (dict): Node -> lower neighbours
+    
+    Returns:
+        int: Number of crossings
+    """
+    lower_rank = {n: i for i, n in enumerate(lower_order)}
+    targets = [
+        lower_rank[child]
+        for node in upper_order
+        for child in sorted(down[node], key=lower_rank.__getitem__)
+    ]
+    tree = [0] * (len(lower_order) + 1)
+    crossings = 0
+    for seen, target in enumerate(targets):
+        # Edges already placed that end strictly right of `target`
+        i, below = target + 1, 0
+        while i > 0:
+            below += tree[i]
+            i -= i & -i
+        crossings += seen - below
+        i = target + 1
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+    return crossings
+
+def _barycenter_sweep(layers, neighbours):
+    """Reorder each layer by the mean position of its neighbours in the previous layer"""
+    for previous, layer in zip(layers, layers[1:]):
+        rank = {n: i for i, n in enumerate(previous)}
+        keys = {}
+        for i, node in enumerate(layer):
+            linked = [rank[n] for n in neighbours[node]]
+            keys[node] = sum(linked) / len(linked) if linked else i
+        layer.sort(key=keys.__getitem__)
+
+def _place_layer(layer, desired, weight):
+    """Place a layer as close as possible to `desired`, keeping its order and a spacing of at least 1"""
+    xs, last = [], None
+    for node in layer:
+        x = desired[node] if last is None else max(desired[node], last + 1)
+        xs.append(x)
+        last = x
+    weights = [weight(n) for n in layer]
+    shift = sum(w * (desired[n] - x) for n, x, w in zip(layer, xs, weights)) / sum(weights)
+    return {node: x + shift for node, x in zip(layer, xs)}
+
+def layered_layout(node_ids, edges, sweeps=4, horiz_gap=1.0, vert_gap=1.0):
+    """
+    Layered layout of a directed graph (Sugiyama method)
+    
+    1. Cycle breaking: back edges are reversed (`break_cycles`).
+    2. Longest-path layering; dummy nodes split edges spanning several layers.
+    3. Crossing minimisation by barycentres, with down and up sweeps; the
+       ordering with the fewest crossings is kept.
+    4. X coordinates: each node as close as possible to its neighbours,
+       without overlaps in its layer.
+    
+    Each sweep is linear in the number of nodes and edges: process maps
+    of a few thousand steps are laid out in a fraction of a second.
+    
+    Args:
+        node_ids (list): Node ids; nodes only found in edges are added
+        edges (list): (source, target) pairs; duplicates and self-loops are ignored
+        sweeps (int): Maximum number of down/up barycentre sweeps
+        horiz_gap (float): Horizontal spacing unit
+        vert_gap (float): Vertical spacing between layers
+    
+    Returns:
+        tuple: (dict node -> (x, y), set of reversed back edges, dict edge -> bend
+        points), bend points being the dummy node positions of edges spanning
+        several layers, from source to target
+    """
+    edges = [(s, t) for s, t in dict.fromkeys(edges) if s != t]
+    node_ids = list(dict.fromkeys([*node_ids, *(n for edge in edges for n in edge)]))
+    reversed_edges = break_cycles(node_ids, edges)
+    acyclic = list(dict.fromkeys((t, s) if (s, t) in reversed_edges else (s, t) for s, t in edges))
+    layer_of = longest_path_layers(node_ids, acyclic)
+    
+    # Dummy nodes: every edge now links two adjacent layers
+    up = {n: [] for n in node_ids}
+    down = {n: [] for n in node_ids}
+    chains = {}
+    for src, tgt in acyclic:
+        dummies = [("__dummy__", src, tgt, k) for k in range(layer_of[src] + 1, layer_of[tgt])]
+        chains[(src, tgt)] = dummies
+        for dummy in dummies:
+            layer_of[dummy], up[dummy], down[dummy] = dummy[3], [], []
+        chain = [src] + dummies + [tgt]
+        for a, b in zip(chain, chain[1:]):
+            up[b].append(a)
+            down[a].append(b)
+    
+    # Initial order: input order, layer by layer
+    layers = [[] for _ in range(max(layer_of.values(), default=-1) + 1)]
+    for node in sorted(layer_of, key=lambda n: layer_of[n]):
+        layers[layer_of[node]].append(node)
+    
+    def total_crossings():
+        return sum(count_crossings(a, b, down) for a, b in zip(layers, layers[1:]))
+    
+    best, best_crossings = [list(layer) for layer in layers], total_crossings()
+    for _ in range(sweeps):
+        if best_crossings == 0:
+            break
+        _barycenter_sweep(layers, up)
+        _barycenter_sweep(layers[::-1], down)
+        crossings = total_crossings()
+        if crossings >= best_crossings:
+            break
+        best, best_crossings = [list(layer) for layer in layers], crossings
+    layers = best
+    
+    # X coordinates: index in the layer, then pulled towards parents and children,
+    # real steps taking priority over dummy nodes
+    def weight(node):
+        return 0.1 if isinstance(node, tuple) and node[0] == "__dummy__" else 1.0
+    
+    x = {node: i - (len(layer) - 1) / 2 for layer in layers for i, node in enumerate(layer)}
+    for sequence, neighbours in ((layers[1:], up), (layers[-2::-1], down)):
+        for layer in sequence:
+            desired = {
+                node: sum(x[n] for n in neighbours[node]) / len(neighbours[node]) if neighbours[node] else x[node]
+                for node in layer
+            }
+            x.update(_place_layer(layer, desired, weight))
+    
+    pos = {node: (x[node] * horiz_gap, -layer_of[node] * vert_gap) for node in node_ids}
+    bends = {}
+    for src, tgt in edges:
+        chain = chains[(tgt, src)][::-1] if (src, tgt) in reversed_edges else chains[(src, tgt)]
+        if chain:
+            bends[(src, tgt)] = [(x[d] * horiz_gap, -layer_of[d] * vert_gap) for d in chain]
+    return pos, reversed_edges, bends
+
+def graph_layout(node_ids, edges):
+    """
+    Cached layered layout of a directed graph, keyed by its nodes and edges only
+    
+    Args:
+        node_ids (list): Node ids, in input order
+        edges (list): (source, target) pairs
+    
+    Returns:
+        tuple: ((positions, reversed back edges, bend points), timing), see
+        `layered_layout` and `cached_layout`
+    """
+    node_ids, edges = tuple(node_ids), tuple(edges)
+    return cached_layout("layered", (node_ids, edges), lambda: layered_layout(node_ids, edges))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tidy tree layout (Reingold-Tilford, Walker in linear time) sized by label extents
+# ─────────────────────────────────────────────────────────────────────────────
+LABEL_WRAP = 24        # characters per label line
+CHAR_WIDTH = 0.075     # inches per character (font size 9, bold)
+LINE_HEIGHT = 0.18     # inches per line
+NODE_PADDING = 0.3     # margin around the text, in inches
+WIDTH_STEP = 0.25      # widths are rounded up to this step in cache keys
+SIBLING_GAP = 0.35     # minimal space between neighbouring subtrees
+LEVEL_GAP = 0.6        # vertical space between levels
+
+def label_extent(label):
+    """
+    Wrap a node label and measure it
+    
+    Args:
+        label (str): The label
+    
+    Returns:
+        tuple: (wrapped label, width, height), sizes in inches
+    """
+    lines = textwrap.wrap(str(label), LABEL_WRAP) or [""]
+    width = max(len(line) for line in lines) * CHAR_WIDTH + NODE_PADDING
+    height = len(lines) * LINE_HEIGHT + NODE_PADDING
+    return "\n".join(lines), width, height
+
+def tidy_tree_layout(tree):
+    """
+    Compute the x coordinate and depth of every node of a tree
+    
+    Walker's algorithm in its linear-time form (Buchheim, Jünger & Leipert):
+    a post-order pass places each subtree against its elder siblings along
+    their facing contours, followed through threads with accumulated
+    modifiers, and spreads the shift over the smaller subtrees in between;
+    a pre-order pass then sums the modifiers. Neighbouring nodes at the same
+    depth are kept SIBLING_GAP apart, edge to edge, and each parent is
+    centred over its first and last child. Both passes are iterative and
+    every node is visited a constant number of times (amortised), so the
+    layout takes O(n) time and deep chains cannot exceed the recursion limit.
+    
+    Args:
+        tree (tuple): (widths, parents), node widths and parent indices in
+            pre-order, the root having parent -1 (see `tree_layout`)
+    
+    Returns:
+        tuple: (x, depth) pairs in pre-order, the root at x = 0
+    """
+    widths, parents = tree
+    n = len(widths)
+    children = [[] for _ in range(n)]
+    for node in range(1, n):
+        children[parents[node]].append(node)
+    # Position among siblings, and left sibling (-1 for a first child)
+    number, left_sibling = [0] * n, [-1] * n
+    for kids in children:
+        for i, child in enumerate(kids):
+            number[child] = i
+            left_sibling[child] = kids[i - 1] if i else -1
+    
+    prelim, mod, shift, change = [0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n
+    thread, ancestor = [-1] * n, list(range(n))
+    # Per parent: the leftmost child, updated while its children are placed
+    default_ancestor = [kids[0] if kids else -1 for kids in children]
+    
+    def next_left(v):
+        return children[v][0] if children[v] else thread[v]
+    
+    def next_right(v):
+        return children[v][-1] if children[v] else thread[v]
+    
+    def distance(a, b):
+        return (widths[a] + widths[b]) / 2 + SIBLING_GAP
+    
+    def apportion(v):
+        """Push the subtree of v clear of its elder siblings' subtrees, level by level"""
+        parent, w = parents[v], left_sibling[v]
+        vir = vor = v
+        vil, vol = w, children[parent][0]
+        sir, sor, sil, sol = mod[vir], mod[vor], mod[vil], mod[vol]
+        while next_right(vil) >= 0 and next_left(vir) >= 0:
+            vil, vir = next_right(vil), next_left(vir)
+            vol, vor = next_left(vol), next_right(vor)
+            ancestor[vor] = v
+            gap = (prelim[vil] + sil) - (prelim[vir] + sir) + distance(vil, vir)
+            if gap > 0:
+                left = ancestor[vil] if parents[ancestor[vil]] == parent else default_ancestor[parent]
+                subtrees = number[v] - number[left]
+                change[v] -= gap / subtrees
+                shift[v] += gap
+                change[left] += gap / subtrees
+                prelim[v] += gap
+                mod[v] += gap
+                sir += gap
+                sor += gap
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) >= 0 and next_left(vol) < 0:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default_ancestor[parent] = v
+    
+    # Post-order pass, children left to right, with an explicit stack
+    stack = [(0, 0)]
+    while stack:
+        v, i = stack.pop()
+        if i < len(children[v]):
+            stack.append((v, i + 1))
+            stack.append((children[v][i], 0))
+            continue
+        kids, w = children[v], left_sibling[v]
+        if kids:
+            # Execute the shifts spread by `apportion`, right to left
+            total_shift = total_change = 0.0
+            for child in reversed(kids):
+                prelim[child] += total_shift
+                mod[child] += total_shift
+                total_change += change[child]
+                total_shift += shift[child] + total_change
+            midpoint = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + distance(w, v)
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        elif w >= 0:
+            prelim[v] = prelim[w] + distance(w, v)
+        if w >= 0:
+            apportion(v)
+    
+    # Pre-order pass: parents come before their children
+    offset, depth, x = [0.0] * n, [0] * n, [0.0] * n
+    offset[0] = -prelim[0]
+    for v in range(n):
+        x[v] = prelim[v] + offset[v]
+        for child in children[v]:
+            offset[child] = offset[v] + mod[v]
+            depth[child] = depth[v] + 1
+    return tuple(zip(x, depth))
+
+def tree_layout(root, children, widths):
+    """
+    Cached tidy layout of a tree, keyed by its shape and node widths only
+    
+    Widths are rounded up to WIDTH_STEP, so small label edits reuse the
+    positions. The tree is flattened in pre-order, which keeps the cache key
+    cheap to hash and avoids recursion on deep trees.
+    
+    Args:
+        root: Root node id
+        children (dict): Node id -> ordered list of child ids
+        widths (dict): Node id -> width in inches (see `label_extent`)
+    
+    Returns:
+        tuple: (dict node -> (x, depth), timing), see `cached_layout`
+    """
+    order, parents = [], []
+    stack = [(root, -1)]
+    while stack:
+        node, parent = stack.pop()
+        parents.append(parent)
+        order.append(node)
+        index = len(order) - 1
+        stack.extend((child, index) for child in reversed(children.get(node, ())))
+    tree = (tuple(-(-widths[node] // WIDTH_STEP) * WIDTH_STEP for node in order), tuple(parents))
+    positions, timing = cached_layout("tidy_tree", tree, lambda: tidy_tree_layout(tree))
+    return dict(zip(order, positions)), timing